@@ -1,6 +1,18 @@
+import os
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
+from collections import deque
+from functools import partial
+
+# The account model lives in banking; its names are re-exported here for code that imports
+# them from Code1, e.g. `from Code1 import BankAccount`
+from banking import (ACCOUNT_TYPES, DATA_DIR, TXN_STATUSES, TXN_TYPES, Bank, BankAccount,  # noqa: F401
+                     BatchResult, Ledger, Money, account_path, format_cents, from_micros, holder_key,
+                     to_cents, to_micros)
+from formatting import FORMATS, HISTORY, PASSBOOK
+import metrics
 
 # Colors and fonts aligned with DEFAULT design guidelines
 BG_COLOR = "#ffffff"  # Light background with lots of whitespace
@@ -21,6 +33,11 @@ MAX_WIDTH = 1200
 CARD_RADIUS = 12
 CARD_SHADOW_COLOR = "#e5e7eb"
 
+TXN_VISIBLE_ROWS = 15   # Rows shown by the history table
+PASSBOOK_ROWS = 15      # Passbook lines per page
+FRAME_MS = 16           # UI poll interval: background results and repaints apply once per frame
+FRAME_BUDGET = 0.008    # Seconds of completed-task callbacks handled per frame before yielding
+
 def round_rectangle(canvas, x1, y1, x2, y2, radius=CARD_RADIUS, **kwargs):
     # Draw a rectangle with rounded corners on a Tkinter Canvas
     points = [
@@ -39,80 +56,60 @@ def round_rectangle(canvas, x1, y1, x2, y2, radius=CARD_RADIUS, **kwargs):
     ]
     return canvas.create_polygon(points, smooth=True, **kwargs)
 
-class BankAccount:
-    def __init__(self, account_holder, balance=0.0, account_type='Savings'):
-        self.account_holder = account_holder
-        self.balance = balance
-        self.account_type = account_type
-        self.transactions = []
-
-    def deposit(self, amount):
-        if amount <= 0:
-            raise ValueError("Deposit amount must be positive.")
-        self.balance += amount
-        self.transactions.append(('Deposit', amount, datetime.now(), 'Completed'))
-
-    def withdraw(self, amount):
-        if amount <= 0:
-            raise ValueError("Withdrawal amount must be positive.")
-        if amount > self.balance:
-            raise ValueError("Insufficient funds.")
-        self.balance -= amount
-        self.transactions.append(('Withdrawal', amount, datetime.now(), 'Completed'))
-
-    def transfer(self, amount, to_account):
-        if amount <= 0:
-            raise ValueError("Transfer amount must be positive.")
-        if amount > self.balance:
-            raise ValueError("Insufficient funds.")
-        self.balance -= amount
-        now = datetime.now()
-        self.transactions.append(('Transfer Sent', amount, now, 'Completed'))
-        self.transactions.append(('Transfer Received', amount, now, 'Completed'))
-
-    def info(self):
-        return {
-            'Account Holder': self.account_holder,
-            'Account Type': self.account_type,
-            'Balance': f"${self.balance:,.2f}"
-        }
-
-    def all_transactions(self):
-        return self.transactions
+def new_request_id():
+    # Idempotency key for a posting started from the UI
+    return "ui-" + os.urandom(12).hex()
 
 class BankApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, **journal_options):
         super().__init__()
         self.title("Bank Account Management Dashboard")
         self.geometry("1100x750")
         self.minsize(900, 700)
         self.configure(bg=BG_COLOR)
 
+        self.bank = Bank(DATA_DIR, **journal_options)
         self.account = None
-        container = tk.Frame(self, bg=BG_COLOR)
-        container.pack(fill="both", expand=True)
-        self.frames = {}
-
-        for F in (LoginPage, Dashboard, PassbookPage, ThankYouPage):
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.server = None  # optional ServerThread sharing self.bank with network clients
+        self.tasks = BackgroundTasks(self)
+        self.container = tk.Frame(self, bg=BG_COLOR)
+        self.container.pack(fill="both", expand=True)
+        self.frames = {}  # pages built so far; the others are built on first use
 
         self.show_frame("LoginPage")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def get_frame(self, page_name):
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = self.frames[page_name] = PAGES[page_name](parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+        return frame
 
     def show_frame(self, page_name):
-        frame = self.frames[page_name]
-        frame.tkraise()
+        self.get_frame(page_name).tkraise()
 
     def logout(self):
         if messagebox.askyesno("Logout Confirmation", "Are you sure you want to logout?"):
-            self.account = None
-            self.frames["Dashboard"].reset()
-            self.frames["PassbookPage"].reset()
-            self.frames["ThankYouPage"].reset()
+            self.close_account()
+            FORMATS.invalidate()
+            for page_name in ("Dashboard", "PassbookPage", "ThankYouPage"):
+                if page_name in self.frames:
+                    self.frames[page_name].reset()
             self.show_frame("LoginPage")
 
+    def close_account(self):
+        # Accounts stay open in the bank so transfers can still reach them
+        self.account = None
+
+    def on_close(self):
+        self.close_account()
+        self.tasks.close()
+        if self.server is not None:
+            self.server.stop()
+        self.bank.close()
+        self.destroy()
+
     def _get_initials(self, name):
         parts = name.strip().split()
         if not parts:
@@ -140,7 +137,7 @@ class LoginPage(tk.Frame):
 
         tk.Label(container, text="Account Type", font=FONT_SMALL, fg=TEXT_PRIMARY, bg=BG_COLOR).pack(anchor="w", pady=(0, 6))
         self.account_type_var = tk.StringVar()
-        self.combo_type = ttk.Combobox(container, values=["Savings", "Checking", "Business"], state="readonly",
+        self.combo_type = ttk.Combobox(container, values=ACCOUNT_TYPES, state="readonly",
                                        textvariable=self.account_type_var, font=FONT_BODY)
         self.combo_type.current(0)
         self.combo_type.pack(fill='x', ipady=10, pady=(0,20))
@@ -162,24 +159,189 @@ class LoginPage(tk.Frame):
         if not name:
             messagebox.showerror("Input Error", "Account Holder Name is required.")
             return
-        if not deposit_str:
-            messagebox.showerror("Input Error", "Initial Deposit is required.")
-            return
         try:
-            deposit = float(deposit_str)
-            if deposit < 0:
-                raise ValueError("Deposit must be positive.")
-        except ValueError:
-            messagebox.showerror("Input Error", "Initial Deposit must be a positive number.")
+            # Returning holder: reopen the saved account, the initial deposit is not needed
+            account = self.controller.bank.find(name)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Account Error", f"Could not open saved account: {e}")
             return
+        if account is None:
+            if not deposit_str:
+                messagebox.showerror("Input Error", "Initial Deposit is required.")
+                return
+            try:
+                deposit = Money.parse(deposit_str)
+                if deposit < 0:
+                    raise ValueError("Deposit must be positive.")
+            except ValueError:
+                messagebox.showerror("Input Error", "Initial Deposit must be a positive number.")
+                return
+            try:
+                account = self.controller.bank.open_account(name, deposit, account_type)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Account Error", f"Could not open account: {e}")
+                return
 
-        self.controller.account = BankAccount(name, deposit, account_type)
+        self.controller.account = account
         self.entry_name.delete(0, tk.END)
         self.entry_deposit.delete(0, tk.END)
         self.combo_type.current(0)
-        self.controller.frames["Dashboard"].setup()
+        self.controller.get_frame("Dashboard").setup()
         self.controller.show_frame("Dashboard")
 
+class BackgroundTasks:
+    # Runs account operations and view-model preparation off the Tk thread. Results are handed
+    # back through a queue polled with after(), at most FRAME_BUDGET of callbacks per frame, and
+    # repaint requests are keyed so any number made within one frame cause a single repaint.
+    # One worker thread keeps operations in submission order; it and concurrent.futures are only
+    # started on the first submit, which keeps them off the path to the login screen.
+    def __init__(self, widget, poll_ms=FRAME_MS, budget=FRAME_BUDGET):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.budget = budget
+        self.pending = 0
+        self.repaints = 0
+        self._submitted = 0  # written by the Tk thread only
+        self._started = 0    # written by the worker only
+        self._executor = None
+        self._results = queue.SimpleQueue()
+        self._repaint = {}
+        self._polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        self.pending += 1
+        self._submitted += 1
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="bank-tasks")
+        future = self._executor.submit(self._run, func, args)
+        future.add_done_callback(lambda f: self._results.put((f, on_done, on_error)))
+        self._schedule()
+
+    def _run(self, func, args):
+        self._started += 1
+        return func(*args)
+
+    def caught_up(self):
+        # True on the worker when no task is queued behind the running one
+        return self._started == self._submitted
+
+    def request_repaint(self, key, func):
+        self._repaint[key] = func
+        self._schedule()
+
+    def _schedule(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        deadline = time.perf_counter() + self.budget
+        while time.perf_counter() < deadline:
+            try:
+                future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            error = future.exception()
+            if error is None:
+                if on_done is not None:
+                    on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+        repaint, self._repaint = self._repaint, {}
+        for func in repaint.values():
+            func()
+        self.repaints += len(repaint)
+        metrics.count("ui.repaints", len(repaint))
+        if self.pending or self._repaint:
+            self._schedule()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+class TransactionHistoryView:
+    # Virtualized newest-first view of a ledger on a Treeview: only the visible window exists as
+    # Tk items, new postings are inserted at the top, and row strings come from the shared
+    # formatting cache.
+    def __init__(self, tree, scrollbar, rows=TXN_VISIBLE_ROWS, cache=FORMATS):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rows = rows
+        self.cache = cache
+        self.ledger = None
+        self.count = 0    # ledger rows already reflected in the view
+        self.offset = 0   # rows scrolled down from the newest entry
+
+    def reset(self):
+        self.tree.delete(*self.tree.get_children())
+        self.ledger = None
+        self.count = 0
+        self.offset = 0
+        self.scrollbar.set(0, 1)
+
+    def refresh(self, ledger):
+        if ledger is not self.ledger:
+            self.reset()
+            self.ledger = ledger
+        total = len(ledger)
+        new = total - self.count
+        self.count = total
+        if new <= 0:
+            return
+        if self.offset:
+            # Keep the rows the user scrolled to in place; new postings land above the window
+            self.offset += new
+        elif new >= self.rows:
+            self._render()
+        else:
+            for values in self.cache.rows(ledger, range(total - new, total), HISTORY):
+                self.tree.insert("", 0, values=values)
+            children = self.tree.get_children()
+            if len(children) > self.rows:
+                self.tree.delete(*children[self.rows:])
+        self._update_scrollbar()
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.count - self.rows))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+            self._update_scrollbar()
+
+    def on_scroll(self, *args):
+        # Scrollbar command protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.rows if args[2] == "pages" else 1)
+            self.scroll_to(self.offset + step)
+
+    def on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_to(self.offset + (-3 if up else 3))
+        return "break"
+
+    def _render(self):
+        newest = self.count - 1 - self.offset
+        indices = range(newest, max(newest - self.rows, -1), -1)
+        rows = self.cache.rows(self.ledger, indices, HISTORY)
+        items = self.tree.get_children()
+        for item, values in zip(items, rows):
+            self.tree.item(item, values=values)
+        for values in rows[len(items):]:
+            self.tree.insert("", "end", values=values)
+        if len(items) > len(indices):
+            self.tree.delete(*items[len(indices):])
+
+    def _update_scrollbar(self):
+        if not self.count:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(self.offset / self.count, min(1.0, (self.offset + self.rows) / self.count))
+
 class Dashboard(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=BG_COLOR)
@@ -245,16 +407,19 @@ class Dashboard(tk.Frame):
         tk.Label(self.txn_card, text="Transaction History", font=FONT_SUBHEADER, fg=TEXT_PRIMARY, bg=CONTAINER_BG).pack(anchor='nw', padx=16, pady=(0, 16))
 
         columns = ("Type", "Amount", "Date", "Status")
-        self.txn_table = ttk.Treeview(self.txn_card, columns=columns, show='headings', height=15)
+        self.txn_table = ttk.Treeview(self.txn_card, columns=columns, show='headings', height=TXN_VISIBLE_ROWS)
         for col in columns:
             self.txn_table.heading(col, text=col)
             anchor = 'center' if col != "Amount" else 'e'
             self.txn_table.column(col, anchor=anchor, width=120 if col != "Amount" else 100)
         self.txn_table.pack(padx=16, pady=(0, 16), fill='both', expand=True)
 
-        scrollbar = ttk.Scrollbar(self.txn_card, orient='vertical', command=self.txn_table.yview)
-        self.txn_table.configure(yscroll=scrollbar.set)
+        scrollbar = ttk.Scrollbar(self.txn_card, orient='vertical')
         scrollbar.pack(side='right', fill='y')
+        self.txn_view = TransactionHistoryView(self.txn_table, scrollbar)
+        scrollbar.configure(command=self.txn_view.on_scroll)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.txn_table.bind(seq, self.txn_view.on_wheel)
 
         # Action Message Label
         self.action_msg_var = tk.StringVar()
@@ -263,24 +428,18 @@ class Dashboard(tk.Frame):
         self.action_label.pack(pady=8)
 
     def setup(self):
-        self.account = self.controller.account
-        info = self.account.info()
-        for i, key in enumerate(["Account Holder", "Account Type", "Balance"]):
-            self.info_values[i].config(text=info[key])
-        self.refresh_transactions()
+        self.repaint()
         self.clear_action_message()
 
     def reset(self):
         for v in self.info_values:
             v.config(text="")
-        self.txn_table.delete(*self.txn_table.get_children())
+        self.txn_view.reset()
         self.clear_action_message()
 
+    @metrics.timed("ui.refresh_transactions")
     def refresh_transactions(self):
-        self.txn_table.delete(*self.txn_table.get_children())
-        for t in reversed(self.account.all_transactions()):
-            dt_str = t[2].strftime("%Y-%m-%d %H:%M:%S")
-            self.txn_table.insert("", "end", values=(t[0], f"${t[1]:,.2f}", dt_str, t[3]))
+        self.txn_view.refresh(self.account.all_transactions())
 
     def clear_action_message(self):
         self.action_msg_var.set("")
@@ -309,21 +468,32 @@ class Dashboard(tk.Frame):
         tk.Label(popup, text="Recipient (Account Holder):", font=FONT_BODY, fg=TEXT_PRIMARY, bg=BG_COLOR).pack(anchor='w', padx=24, pady=(20, 6))
         rec_entry = ttk.Entry(popup, font=FONT_BODY)
         rec_entry.pack(ipady=8, padx=24, fill='x')
+        request_id = new_request_id()
 
         def confirm():
             try:
-                amt = float(amt_entry.get())
+                amt = Money.parse(amt_entry.get())
                 recipient = rec_entry.get().strip()
                 if amt <= 0 or not recipient:
                     raise ValueError
-                self.account.transfer(amt, recipient)
-                self.setup()
-                self.set_action_message(f"➡️ Transferred ${amt:.2f} to {recipient}.")
-                popup.destroy()
-                self.controller.frames["PassbookPage"].setup()
-                self.controller.show_frame("PassbookPage")
             except Exception as e:
                 messagebox.showerror("Error", str(e))
+                return
+
+            def done(view):
+                if popup.winfo_exists():
+                    popup.destroy()
+                self._posted(f"➡️ Transferred ${amt:.2f} to {recipient}.", view)
+
+            def failed(e):
+                if popup.winfo_exists():
+                    btn.config(state='normal')
+                messagebox.showerror("Error", str(e))
+
+            btn.config(state='disabled')  # until the worker answers, so a double click posts once
+            self.controller.tasks.submit(self._run_and_prepare, self.controller.tasks, self.account,
+                                         partial(self.controller.bank.transfer, request_id=request_id),
+                                         self.account, recipient, amt, on_done=done, on_error=failed)
 
         btn = tk.Button(popup, text="Transfer", bg=BUTTON_BG, fg=BUTTON_FG,
                         activebackground=BUTTON_HOVER_BG, font=FONT_BODY,
@@ -340,13 +510,14 @@ class Dashboard(tk.Frame):
         tk.Label(popup, text=f"{action} Amount:", font=FONT_BODY, fg=TEXT_PRIMARY, bg=BG_COLOR).pack(anchor="w", padx=24, pady=(24, 8))
         entry_amount = ttk.Entry(popup, font=FONT_BODY)
         entry_amount.pack(ipady=8, padx=24, fill='x')
+        request_id = new_request_id()  # one posting per popup, however often confirm fires
 
         def confirm():
             try:
-                amt = float(entry_amount.get())
+                amt = Money.parse(entry_amount.get())
                 if amt <= 0:
                     raise ValueError
-                callback(amt)
+                callback(amt, request_id)
                 popup.destroy()
             except Exception:
                 messagebox.showerror("Input error", "Please enter a valid positive number.")
@@ -355,28 +526,186 @@ class Dashboard(tk.Frame):
                         width=15, command=confirm, cursor="hand2")
         btn.pack(pady=24, ipadx=20, ipady=10)
 
-    def do_deposit(self, amount):
-        try:
-            self.account.deposit(amount)
-            self.setup()
-            self.set_action_message(f"✅ Deposited ${amount:.2f} successfully.")
-            self.controller.frames["PassbookPage"].setup()
-            self.controller.show_frame("PassbookPage")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-
-    def do_withdraw(self, amount):
-        try:
-            if amount > self.account.balance:
-                messagebox.showerror("Error", "Insufficient funds.")
-                return
-            self.account.withdraw(amount)
-            self.setup()
-            self.set_action_message(f"✅ Withdrew ${amount:.2f} successfully.")
-            self.controller.frames["PassbookPage"].setup()
-            self.controller.show_frame("PassbookPage")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+    def do_deposit(self, amount, request_id=None):
+        self._post(self.account.deposit, amount, request_id, f"✅ Deposited ${amount:.2f} successfully.")
+
+    def do_withdraw(self, amount, request_id=None):
+        self._post(self.account.withdraw, amount, request_id, f"✅ Withdrew ${amount:.2f} successfully.")
+
+    def _post(self, operation, amount, request_id, message):
+        # Posts on the task worker; the account raises the user-facing errors
+        self.controller.tasks.submit(self._run_and_prepare, self.controller.tasks, self.account,
+                                     partial(operation, request_id=request_id), amount,
+                                     on_done=lambda view: self._posted(message, view),
+                                     on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    @staticmethod
+    def _run_and_prepare(tasks, account, operation, *args):
+        # Worker side: post, then build what the repaint shows (info and formatted passbook
+        # rows), skipped while more postings are queued as their repaints get coalesced anyway
+        operation(*args)
+        if not tasks.caught_up():
+            return account, None, None
+        return account, account.info(), PassbookRenderer.prepare(account.all_transactions())
+
+    def _posted(self, message, view):
+        account, info, rows = view
+        if self.controller.account is not account:
+            return
+        passbook = self.controller.get_frame("PassbookPage")
+        self.set_action_message(message)
+        self.controller.tasks.request_repaint("Dashboard", lambda: self.repaint(info))
+        self.controller.tasks.request_repaint("PassbookPage", lambda: passbook.setup(rows))
+        self.controller.show_frame("PassbookPage")
+
+    def repaint(self, info=None):
+        # setup() without clearing the action message
+        if self.controller.account is None:
+            return
+        self.account = self.controller.account
+        info = info or self.account.info()
+        for i, key in enumerate(["Account Holder", "Account Type", "Balance"]):
+            self.info_values[i].config(text=info[key])
+        self.refresh_transactions()
+
+class PassbookRenderer:
+    # Retained-mode passbook on a canvas: the card, headers and a pool of row text items are
+    # created once; a refresh only itemconfigures texts that changed. New postings on the
+    # first page move the row pool down and recycle the bottom rows instead of rewriting all.
+    # Row strings come from the shared formatting cache, the next page's ahead of time.
+    # tk_calls counts every canvas call, last_refresh_calls those of the latest refresh.
+    columns = [(80, 'w'), (280, 'w'), (560, 'e'), (720, 'e'), (770, 'w')]
+    headers = ["Date", "Type", "Amount", "Balance", "Status"]
+    y_start = 140
+    line_h = 30
+
+    def __init__(self, canvas, rows=PASSBOOK_ROWS, cache=FORMATS):
+        self.canvas = canvas
+        self.rows = rows
+        self.cache = cache
+        self.ledger = None
+        self.page = 0
+        self.tk_calls = 0
+        self.last_refresh_calls = 0
+        self._rendered = None  # (ledger, length, page) of the rows on screen
+        self._draw_chrome()
+        self.slots = deque()
+        self.shown = deque()
+        for k in range(rows):
+            y = self.y_start + k * self.line_h
+            self.slots.append([self._tk(canvas.create_text, x, y, text="", anchor=anchor, font=FONT_MONO,
+                                        fill=TEXT_PRIMARY, tags=("row",)) for x, anchor in self.columns])
+            self.shown.append(("",) * len(self.columns))
+
+    def _tk(self, method, *args, **kwargs):
+        self.tk_calls += 1
+        return method(*args, **kwargs)
+
+    def _draw_chrome(self):
+        c = self.canvas
+        w = int(c['width'])
+        h = int(c['height'])
+        self._tk(round_rectangle, c, 5, 5, w - 5, h - 5, radius=CARD_RADIUS, fill='white', outline=CARD_SHADOW_COLOR, width=2)
+        self._tk(c.create_text, w // 2, 40, text="Passbook", font=("Inter", 28, "bold"), fill=TEXT_PRIMARY)
+        for (pos, _), htext in zip(self.columns, self.headers):
+            self._tk(c.create_text, pos, 90, text=htext, font=("Inter", 14, "bold"), fill=TEXT_SECONDARY)
+        self._tk(c.create_line, 50, h-70, w-50, h-70, fill=TEXT_SECONDARY, width=2)
+        self._tk(c.create_text, w // 2, h-40, text="End of Passbook Preview", font=("Inter", 12, "italic"), fill=TEXT_SECONDARY)
+        self.page_label = self._tk(c.create_text, w - 60, 40, text="", anchor='e', font=FONT_SMALL, fill=TEXT_SECONDARY)
+        newer = self._tk(c.create_text, 60, h-40, text="‹ Newer", anchor='w', font=FONT_SMALL, fill=TEXT_PRIMARY)
+        older = self._tk(c.create_text, w - 60, h-40, text="Older ›", anchor='e', font=FONT_SMALL, fill=TEXT_PRIMARY)
+        self._tk(c.tag_bind, newer, "<Button-1>", lambda e: self.newer())
+        self._tk(c.tag_bind, older, "<Button-1>", lambda e: self.older())
+        self._page_text = ""
+
+    def page_count(self):
+        return max(1, -(-len(self.ledger) // self.rows)) if self.ledger is not None else 1
+
+    def show(self, ledger, prepared=None):
+        # prepared: rows from prepare(), formatted ahead of time off the Tk thread
+        if ledger is not self.ledger:
+            self.ledger = ledger
+            self.page = 0
+        if prepared and ledger is not None:
+            self.cache.put(ledger, prepared, PASSBOOK)
+        self.refresh()
+
+    @staticmethod
+    def prepare(ledger, rows=PASSBOOK_ROWS, cache=FORMATS):
+        # Formatted first two pages, newest first
+        n = len(ledger)
+        indices = range(n - 1, max(n - 2 * rows, 0) - 1, -1)
+        return dict(zip(indices, cache.rows(ledger, indices, PASSBOOK)))
+
+    def older(self):
+        if self.ledger is not None and self.page + 1 < self.page_count():
+            self.page += 1
+            self.refresh()
+
+    def newer(self):
+        if self.page > 0:
+            self.page -= 1
+            self.refresh()
+
+    def reset(self):
+        self.ledger = None
+        self.page = 0
+        self.refresh()
+
+    def refresh(self):
+        start_calls = self.tk_calls
+        ledger = self.ledger
+        length = len(ledger) if ledger is not None else 0
+        previous = self._rendered
+        new = length - previous[1] if previous and previous[0] is ledger and previous[2] == self.page == 0 else 0
+        shifted = 0 < new < self.rows
+        if shifted:
+            self._shift(new)
+        self._render_rows(length, new if shifted else self.rows)
+        self._rendered = (ledger, length, self.page)
+        label = f"Page {self.page + 1} of {self.page_count()}" if ledger is not None else ""
+        if label != self._page_text:
+            self._tk(self.canvas.itemconfigure, self.page_label, text=label)
+            self._page_text = label
+        self.last_refresh_calls = self.tk_calls - start_calls
+        if not shifted:
+            self._prefetch(length)
+
+    def _shift(self, k):
+        # Move every row down k lines and recycle the k bottom slots as the new top rows
+        self._tk(self.canvas.move, "row", 0, k * self.line_h)
+        self.slots.rotate(k)
+        self.shown.rotate(k)
+        for j in range(k):
+            y = self.y_start + j * self.line_h
+            for item, (x, _) in zip(self.slots[j], self.columns):
+                self._tk(self.canvas.coords, item, x, y)
+
+    def _page_indices(self, page, length):
+        hi = length - page * self.rows
+        return range(hi - 1, max(hi - self.rows, 0) - 1, -1)
+
+    def _render_rows(self, length, changed):
+        # Only the first `changed` rows can differ from what is shown, e.g. after a shift
+        rows = []
+        if self.ledger is not None:
+            rows = self.cache.rows(self.ledger, self._page_indices(self.page, length)[:changed], PASSBOOK)
+        blank = ("",) * len(self.columns)
+        for k in range(changed):
+            slot = self.slots[k]
+            texts = rows[k] if k < len(rows) else blank
+            shown = self.shown[k]
+            if texts != shown:
+                for item, text, old in zip(slot, texts, shown):
+                    if text != old:
+                        self._tk(self.canvas.itemconfigure, item, text=text)
+                self.shown[k] = texts
+
+    def _prefetch(self, length):
+        # Format the next page ahead of time; skipped for postings shifting the first page,
+        # after which older() finds all but the newly shifted rows cached
+        if self.ledger is not None:
+            self.cache.rows(self.ledger, self._page_indices(self.page + 1, length), PASSBOOK)
 
 class PassbookPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -400,16 +729,12 @@ class PassbookPage(tk.Frame):
 
         self.canvas = tk.Canvas(self, width=950, height=600, bg="white", highlightthickness=0)
         self.canvas.pack(padx=40, pady=24)
-
-        self._draw_card_background()
+        self.renderer = PassbookRenderer(self.canvas)
 
         self.sticker_canvas = tk.Canvas(self, width=100, height=100, bg=CONTAINER_BG, highlightthickness=0)
         self.sticker_canvas.place(relx=0.85, rely=0.7)
         self.draw_sticker()
 
-    def _draw_card_background(self):
-        round_rectangle(self.canvas, 5, 5, 945, 595, radius=CARD_RADIUS, fill='white', outline=CARD_SHADOW_COLOR, width=2)
-
     def draw_sticker(self):
         c = self.sticker_canvas
         size = 90
@@ -420,45 +745,17 @@ class PassbookPage(tk.Frame):
         c.create_oval(55, 30, 65, 40, fill="white", outline="")
         c.create_arc(25, 45, 65, 70, start=210, extent=120, style='arc', width=3, outline="white")
 
-    def setup(self):
+    def setup(self, prepared=None):
         self.account = self.controller.account
-        self.draw_passbook()
-
-    def draw_passbook(self):
-        c = self.canvas
-        c.delete("all")
-        self._draw_card_background()
-        if not self.account:
-            return
+        self.draw_passbook(prepared)
 
-        w = int(c['width'])
-        h = int(c['height'])
-
-        c.create_text(w // 2, 40, text="Passbook", font=("Inter", 28, "bold"), fill=TEXT_PRIMARY)
-
-        headers = ["Date", "Type", "Amount", "Status"]
-        positions = [80, 300, 600, 750]
-        for pos, htext in zip(positions, headers):
-            c.create_text(pos, 90, text=htext, font=("Inter", 14, "bold"), fill=TEXT_SECONDARY)
-
-        y_start = 140
-        line_h = 30
-        max_entries = 15
-        txns = self.account.all_transactions()[-max_entries:]
-        y = y_start
-        for t in reversed(txns):
-            dt_str = t[2].strftime("%Y-%m-%d %H:%M")
-            c.create_text(positions[0], y, text=dt_str, anchor='w', font=FONT_MONO, fill=TEXT_PRIMARY)
-            c.create_text(positions[1], y, text=t[0], anchor='w', font=FONT_MONO, fill=TEXT_PRIMARY)
-            c.create_text(positions[2], y, text=f"${t[1]:,.2f}", anchor='e', font=FONT_MONO, fill=TEXT_PRIMARY)
-            c.create_text(positions[3], y, text=t[3], anchor='w', font=FONT_MONO, fill=TEXT_PRIMARY)
-            y += line_h
-
-        c.create_line(50, h-70, w-50, h-70, fill=TEXT_SECONDARY, width=2)
-        c.create_text(w // 2, h-40, text="End of Passbook Preview", font=("Inter", 12, "italic"), fill=TEXT_SECONDARY)
+    @metrics.timed("ui.draw_passbook")
+    def draw_passbook(self, prepared=None):
+        self.renderer.show(self.account.all_transactions() if self.account else None, prepared)
 
     def reset(self):
-        self.canvas.delete("all")
+        self.account = None
+        self.renderer.reset()
 
 class ThankYouPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -491,6 +788,18 @@ class ThankYouPage(tk.Frame):
     def reset(self):
         pass
 
+PAGES = {F.__name__: F for F in (LoginPage, Dashboard, PassbookPage, ThankYouPage)}
+
 if __name__ == "__main__":
-    app = BankApp()
+    import argparse
+    parser = argparse.ArgumentParser(description="Bank Account Management Dashboard")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="also serve this bank over JSON lines on host:port or unix:/path")
+    parser.add_argument("--commit-window", type=float, default=0.0, metavar="SECONDS",
+                        help="group-commit window for journal writes (default: 0, fsync every posting)")
+    args = parser.parse_args()
+    app = BankApp(commit_window=args.commit_window)
+    if args.serve:
+        from server import ServerThread
+        app.server = ServerThread(app.bank, args.serve).start()
     app.mainloop()
@@ -0,0 +1,976 @@
+# Account model: Money, the columnar Ledger, journal-backed BankAccounts and the Bank registry.
+# Importable without Tk, for the server, reports, benchmarks and scripts; Code1 builds the
+# dashboard on top of it.
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from collections import deque, namedtuple
+from datetime import datetime
+from decimal import Decimal
+from fractions import Fraction
+from functools import total_ordering
+from operator import eq, itemgetter, lt, mul, neg
+
+from journal import Journal, JournalView, read_meta
+import metrics
+import statement
+from units import ONE_MICRO, format_cents, from_micros, to_micros
+
+# Where account journals live between runs
+DATA_DIR = os.environ.get("BANK_DATA_DIR", os.path.join(os.path.expanduser("~"), ".bank_dashboard"))
+
+# Code tables for the ledger's type and status columns. Journals store only the codes, so the
+# tables are fixed: a name missing from them is refused rather than added.
+ACCOUNT_TYPES = ['Savings', 'Checking', 'Business']
+TXN_TYPES = ['Deposit', 'Withdrawal', 'Transfer Sent', 'Transfer Received']
+TXN_STATUSES = ['Completed']
+_TYPE_CODES = {name: code for code, name in enumerate(TXN_TYPES)}
+_STATUS_CODES = {name: code for code, name in enumerate(TXN_STATUSES)}
+_TYPE_SIGNS = {'Deposit': 1, 'Withdrawal': -1, 'Transfer Sent': -1, 'Transfer Received': 1}
+
+def _code(codes, value, what):
+    code = codes.get(value)
+    if code is None:
+        raise ValueError(f"Unknown {what}: {value!r}.")
+    return code
+
+@total_ordering
+class Money:
+    # Fixed-point amount held as integer cents. Arithmetic and comparisons stay in integers, so
+    # sums never drift; plain numbers are read as dollars (Money(150) == 1.5 and Money(150) == Money.parse("1.50")).
+    # Arithmetic rounds a float to cents, but comparisons with floats and Decimals are exact, as
+    # their hashes are: Money(110) != 1.1, whose binary value is just above 1.10.
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=0):
+        self.cents = cents
+
+    @classmethod
+    def parse(cls, text):
+        # Accepts "1234", "1,234.5", "$12.34" or "-0.75"; at most two decimal places
+        whole, _, frac = text.partition('.')
+        if len(frac) == 2 and whole.isdigit() and frac.isdigit() and text.isascii():
+            return cls(int(whole) * 100 + int(frac))
+        s = text.strip().replace(',', '')
+        negative = s.startswith('-')
+        if negative:
+            s = s[1:]
+        if s.startswith('$'):
+            s = s[1:]
+        whole, dot, frac = s.partition('.')
+        digits = whole + frac
+        if not digits or len(frac) > 2 or not digits.isascii() or not digits.isdigit():
+            raise ValueError(f"Invalid amount: {text!r}")
+        cents = int(whole or 0) * 100 + int(frac.ljust(2, '0'))
+        return cls(-cents if negative else cents)
+
+    @classmethod
+    def coerce(cls, value):
+        return value if type(value) is cls else cls(to_cents(value))
+
+    def __add__(self, other):
+        return Money(self.cents + to_cents(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Money(self.cents - to_cents(other))
+
+    def __rsub__(self, other):
+        return Money(to_cents(other) - self.cents)
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __mul__(self, factor):
+        if not isinstance(factor, int):
+            return NotImplemented
+        return Money(self.cents * factor)
+
+    __rmul__ = __mul__
+
+    def _compare(self, other, op):
+        if type(other) is float or isinstance(other, Decimal):
+            return op(Fraction(self.cents, 100), other)
+        try:
+            return op(self.cents, to_cents(other))
+        except (TypeError, ValueError):
+            return NotImplemented
+
+    def __eq__(self, other):
+        return self._compare(other, eq)
+
+    def __lt__(self, other):
+        return self._compare(other, lt)
+
+    def __hash__(self):
+        # Equal numbers must hash alike, and Decimal hashes like the int/float of the same value
+        return hash(Decimal(self.cents).scaleb(-2))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __str__(self):
+        return format_cents(self.cents)
+
+    def __format__(self, spec):
+        return format_cents(self.cents, spec)
+
+def to_cents(amount):
+    # Integer cents for a Money, int/float dollars, an amount string or a Decimal
+    t = type(amount)
+    if t is Money:
+        return amount.cents
+    if t is int:
+        return amount * 100
+    if t is float:
+        return round(amount * 100)
+    if t is str:
+        return Money.parse(amount).cents
+    if isinstance(amount, Decimal):
+        return int((amount * 100).to_integral_value())
+    if t is bool:
+        raise TypeError(f"Invalid amount: {amount!r}")
+    return round(float(amount) * 100)
+
+def holder_key(holder):
+    return holder.strip().lower()
+
+_NAME_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
+_MAX_NAME = 200  # longer escaped names are replaced by a digest, to stay within filename limits
+
+def account_path(holder, data_dir=DATA_DIR):
+    # One journal per holder_key. Characters outside [a-z0-9-] are escaped as _xx per UTF-8 byte,
+    # so distinct keys never share a file name; very long keys are named by their SHA-256.
+    key = holder_key(holder)
+    name = ''.join(c if c in _NAME_CHARS else ''.join(f'_{b:02x}' for b in c.encode('utf-8', 'surrogatepass'))
+                   for c in key) or '_'
+    if len(name) > _MAX_NAME:
+        name = '~' + hashlib.sha256(key.encode('utf-8', 'surrogatepass')).hexdigest()
+    return os.path.join(data_dir, name + '.journal')
+
+def _legacy_account_path(holder, data_dir):
+    # Journals created before names were escaped used a lossy slug that several holders could
+    # share, so one found there is only used if its snapshot names the same holder
+    slug = re.sub(r'[^a-z0-9_-]+', '_', holder_key(holder)) or 'account'
+    return os.path.join(data_dir, slug + '.journal')
+
+def _make_row(kind, cents, micros, status):
+    return (TXN_TYPES[kind], Money(cents), from_micros(micros), TXN_STATUSES[status])
+
+_ledger_ids = itertools.count(1)
+_INDEX_CHUNK = 65_536  # rows per step when catching up the type indexes
+_ITER_CHUNK = 65_536   # rows sliced out at a time when iterating
+
+class Ledger:
+    # Columnar transaction store: one typed array per field instead of a tuple per row.
+    # Rows are rebuilt on access as (type, amount, datetime, status) tuples.
+    # The first `base` rows may live only in a journal, read in place through a JournalView
+    # (mmap) on access; iterating copies them out of the view a chunk at a time.
+    # Timestamps never decrease, so the timestamp column doubles as the primary index; date
+    # bounds bisect the view's timestamps for journal rows and the array for the rest.
+    # Rows never change once appended; uid tells ledgers apart for caches keyed by row.
+    # Alongside it the ledger keeps the running balance after every row and, per type, the
+    # row indices and running totals, so balances and period totals come from bisection. The
+    # per-type indexes are built by the first query that needs them and caught up by later ones.
+    def __init__(self, backing=None, base=0, opening=0):
+        self.kinds = array('B')
+        self.statuses = array('B')
+        self.amounts = array('q')     # integer cents
+        self.balances = array('q')    # balance after each row, integer cents
+        self.timestamps = array('q')  # epoch microseconds, non-decreasing
+        # Rows in the arrays whose columns are all written. Readers on other threads (the Tk
+        # thread, server workers) take no lock, so a row is published only after its last column.
+        self._size = 0
+        self.opening = opening
+        self.uid = next(_ledger_ids)
+        self._backing = backing
+        self._base = base
+        last = backing.read(base - 1) if base else None
+        self._last_micros = last[0] if last else 0
+        self._last_balance = last[2] if last else opening
+        self._by_kind = {}      # type code -> array of row indices
+        self._kind_totals = {}  # type code -> cumulative amount along _by_kind
+        self._indexed = 0       # rows covered by the type indexes; queries catch up the rest
+        self._index_lock = threading.Lock()  # queries on different threads catch up one at a time
+
+    @classmethod
+    def mapped(cls, path):
+        # Read-only ledger over an account's journal file, e.g. for a reporting process while
+        # the dashboard owns the account: opening maps the file and reads no records
+        view = JournalView(path)
+        return cls(view, len(view), view.meta['opening'])
+
+    # append, extend and load take an optional `log`, e.g. a journal's append or append_many,
+    # that is given the new records before any is stored; if it raises, the ledger is unchanged.
+
+    def _stamp(self, when):
+        # A clock step backwards must not break the ordering the range index relies on
+        return max(to_micros(when), self._last_micros)
+
+    def append(self, kind, cents, when, status='Completed', log=None):
+        # Returns the stored record as (micros, cents, balance after, type code, status code)
+        code = _code(_TYPE_CODES, kind, 'transaction type')
+        balance = self._last_balance + _TYPE_SIGNS[kind] * cents
+        record = (self._stamp(when), cents, balance, code, _code(_STATUS_CODES, status, 'transaction status'))
+        if log is not None:
+            log(*record)
+        self._last_micros, self._last_balance = record[0], balance
+        self.timestamps.append(record[0])
+        self.amounts.append(cents)
+        self.balances.append(record[2])
+        self.kinds.append(code)
+        self.statuses.append(record[4])
+        self._size += 1
+        return record
+
+    def extend(self, kinds, amounts, when, status='Completed', deltas=None, log=None):
+        # Bulk append of rows sharing one timestamp and status; amounts are integer cents, and
+        # deltas their signed effect on the balance when the caller has computed them already
+        micros = self._stamp(when)
+        status_code = _code(_STATUS_CODES, status, 'transaction status')
+        for kind in set(kinds):
+            _code(_TYPE_CODES, kind, 'transaction type')
+        codes = bytes(map(_TYPE_CODES.__getitem__, kinds))
+        if deltas is None:
+            deltas = map(mul, map(_TYPE_SIGNS.__getitem__, kinds), amounts)
+        balances = list(itertools.accumulate(deltas, initial=self._last_balance))
+        del balances[0]
+        if log is not None:
+            log(zip(itertools.repeat(micros), amounts, balances, codes, itertools.repeat(status_code)))
+        if balances:
+            self._last_micros, self._last_balance = micros, balances[-1]
+        self.kinds.frombytes(codes)
+        self.amounts.extend(amounts)
+        self.balances.extend(balances)
+        self.timestamps.extend(array('q', [micros]) * len(codes))
+        self.statuses.extend(array('B', [status_code]) * len(codes))
+        self._size += len(codes)
+        return zip(itertools.repeat(micros), amounts, balances, codes, itertools.repeat(status_code))
+
+    def out_of_order(self, micros):
+        # Position of the first of `micros` dated before the one preceding it (the ledger's last
+        # row for the first), or None when they can be appended as they are
+        if not len(micros):
+            return None
+        if micros[0] < self._last_micros:
+            return 0
+        return next(itertools.compress(itertools.count(1), map(lt, micros[1:], micros)), None)
+
+    def load(self, kinds, amounts, micros, statuses, log=None):
+        # Bulk append of rows carrying their own timestamps and statuses (type and status codes).
+        # Rows keep their dates, so they must not be older than the ledger's last row.
+        bad = self.out_of_order(micros)
+        if bad is not None:
+            raise ValueError(f"Row {bad + 1} is dated {from_micros(micros[bad])}, before the transaction "
+                             f"preceding it; rows must be added in time order.")
+        signs = {code: _TYPE_SIGNS.get(TXN_TYPES[code], 0) for code in set(kinds)}
+        balances = array('q', itertools.accumulate(map(mul, map(signs.__getitem__, kinds), amounts),
+                                                   initial=self._last_balance))
+        stamps = array('q', micros)
+        del balances[0]
+        if log is not None:
+            log(zip(stamps, amounts, balances, kinds, statuses))
+        if balances:
+            self._last_balance = balances[-1]
+            self._last_micros = stamps[-1]
+        self.kinds.extend(kinds)
+        self.amounts.extend(amounts)
+        self.balances.extend(balances)
+        self.timestamps.extend(stamps)
+        self.statuses.extend(statuses)
+        self._size += len(kinds)
+        return zip(stamps, amounts, balances, kinds, statuses)
+
+    def row(self, i):
+        if i < self._base:
+            micros, cents, _, kind, status = self._backing.read(i)
+            return _make_row(kind, cents, micros, status)
+        i -= self._base
+        return _make_row(self.kinds[i], self.amounts[i], self.timestamps[i], self.statuses[i])
+
+    def record(self, i):
+        # Row i as stored: (micros, cents, balance after, type code, status code)
+        if i < self._base:
+            return self._backing.read(i)
+        i -= self._base
+        return self.timestamps[i], self.amounts[i], self.balances[i], self.kinds[i], self.statuses[i]
+
+    def columns(self, indices):
+        # (micros, cents, balances after, type codes, status codes) of the rows in `indices`; a
+        # contiguous range is sliced straight from the view and the arrays
+        if isinstance(indices, range) and indices.step in (1, -1) and indices:
+            first, last = sorted((indices[0], indices[-1]))
+            columns = self._slice(first, last + 1)
+            return columns if indices.step == 1 else tuple(column[::-1] for column in columns)
+        return self._gather(indices)
+
+    def _slice(self, lo, hi):
+        # Columns of rows [lo, hi) as arrays: journal rows are copied out of the view's strided
+        # memoryviews, in-memory rows sliced from the arrays
+        base = self._base
+        columns = (self.timestamps, self.amounts, self.balances, self.kinds, self.statuses)
+        if lo >= base:
+            return tuple(column[lo - base:hi - base] for column in columns)
+        view = self._backing
+        mapped = (view.micros, view.cents, view.balances, view.kinds, view.statuses)
+        out = []
+        for column, source in zip(columns, mapped):
+            part = array(column.typecode, source[lo:min(hi, base)].tobytes())
+            if hi > base:
+                part += column[:hi - base]
+            out.append(part)
+        return tuple(out)
+
+    def _gather(self, indices):
+        return tuple(map(list, zip(*map(self.record, indices)))) or ([],) * 5
+
+    def balance_after(self, i):
+        if i < self._base:
+            return Money(self._backing.read(i)[2])
+        return Money(self.balances[i - self._base])
+
+    def close(self):
+        # Unmaps the journal view when the account closes; rows only in the journal cannot be
+        # read after that
+        if self._backing is not None:
+            view, self._backing = self._backing, None
+            view.close()
+
+    def __len__(self):
+        return self._base + self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ledger index out of range")
+        return self.row(index)
+
+    def _rows(self, lo, hi):
+        micros, cents, _, kinds, statuses = self._slice(lo, hi)
+        return list(map(_make_row, kinds, cents, micros, statuses))
+
+    # Iterating reads the rows there are when it starts, through _slice like any other query;
+    # nothing is loaded or moved, so appends and readers on other threads are unaffected
+    def __iter__(self):
+        n = len(self)
+        for lo in range(0, n, _ITER_CHUNK):
+            yield from self._rows(lo, min(lo + _ITER_CHUNK, n))
+
+    def __reversed__(self):
+        for hi in range(len(self), 0, -_ITER_CHUNK):
+            yield from reversed(self._rows(max(hi - _ITER_CHUNK, 0), hi))
+
+    def nbytes(self):
+        columns = (self.kinds, self.statuses, self.amounts, self.balances, self.timestamps)
+        return sum(col.itemsize * len(col) for col in columns)
+
+    def _ensure_index(self):
+        # Catches the per-type indexes up with the rows added since the last call, a chunk at a
+        # time; returns the rows covered, which callers must not look past
+        with self._index_lock:
+            start, n = self._indexed, len(self)
+            for lo in range(start, n, _INDEX_CHUNK):
+                hi = min(lo + _INDEX_CHUNK, n)
+                _, amounts, _, recent, _ = self._slice(lo, hi)
+                for code in set(recent):
+                    if code not in self._by_kind:
+                        self._by_kind[code] = array('q')
+                        self._kind_totals[code] = array('q')
+                    totals = self._kind_totals[code]
+                    mask = list(map(code.__eq__, recent))
+                    running = itertools.accumulate(itertools.compress(amounts, mask), initial=totals[-1] if totals else 0)
+                    next(running)
+                    totals.extend(running)
+                    self._by_kind[code].extend(itertools.compress(range(lo, hi), mask))
+            self._indexed = n
+            return n
+
+    def _bisect(self, bisect, micros):
+        # bisect_left/bisect_right over the whole timestamp column: the view's for journal
+        # rows, then the array's
+        base = self._base
+        if base:
+            i = bisect(self._backing.micros, micros, 0, base)
+            if i < base:
+                return i
+        return base + bisect(self.timestamps, micros, 0, self._size)
+
+    def bounds(self, start=None, end=None):
+        # Row range [lo, hi) of entries with start <= timestamp < end, by bisection
+        if start is None and end is None:
+            return 0, len(self)
+        lo = 0 if start is None else self._bisect(bisect_left, to_micros(start))
+        hi = len(self) if end is None else self._bisect(bisect_left, to_micros(end))
+        return lo, max(lo, hi)
+
+    def positions(self, start=None, end=None, types=None, cursor=None, newest_first=False):
+        # Lazy iterator of row indices in [start, end) with a type in `types`, in time order
+        # (or newest first), resuming after the row index `cursor` from a previous page.
+        lo, hi = self.bounds(start, end)
+        if cursor is not None:
+            if newest_first:
+                hi = min(hi, cursor)
+            else:
+                lo = max(lo, cursor + 1)
+        if lo >= hi:
+            return iter(())
+        if types is None:
+            span = range(lo, hi)
+            return iter(reversed(span) if newest_first else span)
+        if isinstance(types, str):
+            types = [types]
+        hi = min(hi, self._ensure_index())
+        runs = []
+        for kind in types:
+            index = self._by_kind.get(_TYPE_CODES.get(kind), ())
+            a, b = bisect_left(index, lo), bisect_left(index, hi)
+            span = range(b - 1, a - 1, -1) if newest_first else range(a, b)
+            runs.append(map(index.__getitem__, span))
+        if len(runs) == 1:
+            return runs[0]
+        return merge(*runs, reverse=newest_first)
+
+    def query(self, start=None, end=None, types=None, cursor=None, newest_first=False):
+        return map(self.row, self.positions(start, end, types, cursor, newest_first))
+
+    def chunks(self, start=None, end=None, types=None, size=statement.CHUNK_ROWS):
+        # statement.Chunks of the matching rows in time order, read `size` rows at a time: journal
+        # rows are copied out of the view chunk by chunk, so exporting holds one chunk in memory
+        # and leaves the history in the journal
+        lo, hi = self.bounds(start, end)
+        type_names, status_names = list(TXN_TYPES), list(TXN_STATUSES)
+        if isinstance(types, str):
+            types = [types]
+        codes = None if types is None else {_TYPE_CODES[kind] for kind in types if kind in _TYPE_CODES}
+        for a in range(lo, hi, size):
+            columns = self._slice(a, min(a + size, hi))
+            if codes is not None:
+                mask = list(map(codes.__contains__, columns[3]))
+                if not any(mask):
+                    continue
+                if not all(mask):
+                    columns = [array(column.typecode, itertools.compress(column, mask)) for column in columns]
+            yield statement.Chunk(*columns, type_names, status_names)
+
+    def balance_at(self, when):
+        # Balance after every entry stamped at or before `when`
+        i = self._bisect(bisect_right, to_micros(when))
+        return self.balance_after(i - 1) if i else Money(self.opening)
+
+    def totals(self, start=None, end=None):
+        # {type: Money} summed over entries with start <= timestamp < end
+        lo, hi = self.bounds(start, end)
+        covered = self._ensure_index()
+        lo, hi = min(lo, covered), min(hi, covered)
+        result = {kind: Money(0) for kind in TXN_TYPES}
+        for code, positions in self._by_kind.items():
+            totals = self._kind_totals[code]
+            a, b = bisect_left(positions, lo), bisect_left(positions, hi)
+            result[TXN_TYPES[code]] = Money((totals[b - 1] if b else 0) - (totals[a - 1] if a else 0))
+        return result
+
+    def monthly(self, start=None, end=None):
+        # One rollup per calendar month: opening and closing balance plus per-type totals
+        n = len(self)
+        if not n:
+            return []
+        first = start or from_micros(self.record(0)[0])
+        last = end or from_micros(self.record(n - 1)[0]) + ONE_MICRO
+        month = datetime(first.year, first.month, 1)
+        rollups = []
+        while month < last:
+            following = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+            lo, hi = self.bounds(max(month, first), min(following, last))
+            rollups.append(dict(month=month.date(),
+                                opening=self.balance_after(lo - 1) if lo else Money(self.opening),
+                                closing=self.balance_after(hi - 1) if hi else Money(self.opening),
+                                **self.totals(max(month, first), min(following, last))))
+            month = following
+        return rollups
+
+DEDUP_WINDOW = 3600.0   # seconds a posting's request_id is remembered
+DEDUP_CAPACITY = 65_536  # request_ids remembered per account at most
+
+class DedupIndex:
+    # Results of recent keyed postings, for idempotent retries. A dict maps each key to its
+    # expiry, the posting's fingerprint and its result; a ring of keys in insertion order expires
+    # them: every add drops the expired keys at the ring's tail, and when the ring is full it
+    # drops the oldest key even if still live, so memory stays bounded at any posting rate.
+    # Keys are remembered for `window` seconds or the last `capacity` keys, whichever is fewer.
+    # Not thread-safe; accounts use it under their lock.
+    def __init__(self, window=DEDUP_WINDOW, capacity=DEDUP_CAPACITY, clock=time.monotonic):
+        self.window = window
+        self.capacity = capacity
+        self.clock = clock
+        self.hits = 0
+        self.evicted_live = 0  # keys dropped before their window ended because the ring was full
+        self._entries = {}     # key -> (expires, fingerprint, result)
+        self._ring = deque()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, fingerprint):
+        # (True, result) for a live key, (False, None) otherwise; a live key used for a different
+        # posting raises ValueError
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            return False, None
+        if entry[1] != fingerprint:
+            raise ValueError(f"Request ID {key!r} was already used for a different posting.")
+        self.hits += 1
+        return True, entry[2]
+
+    def add(self, key, fingerprint, result):
+        now = self.clock()
+        ring = self._ring
+        entries = self._entries
+        while ring and entries[ring[0]][0] <= now:
+            del entries[ring.popleft()]
+        if key in entries:
+            # re-added while live (accounts call get() first, so only with a changed window)
+            ring.remove(key)
+        elif len(ring) >= self.capacity:
+            del entries[ring.popleft()]
+            self.evicted_live += 1
+        entries[key] = (now + self.window, fingerprint, result)
+        ring.append(key)
+
+_account_ids = itertools.count(1)
+
+_BATCH_OPS = {'deposit': 'Deposit', 'withdraw': 'Withdrawal', 'withdrawal': 'Withdrawal'}
+_BATCH_CHUNK = 4096  # rows per prefix-sum scan, bounds the rescan cost after an overdraft
+
+_PLAIN_NUMBERS = {int, float}
+
+BatchResult = namedtuple('BatchResult', 'accepted rejected')
+
+class BankAccount:
+    def __init__(self, account_holder, balance=0.0, account_type='Savings', journal=None, ledger=None,
+                 opening_balance=None):
+        self.account_id = next(_account_ids)
+        self.account_holder = account_holder
+        self._cents = to_cents(balance)
+        self.opening_balance = Money.coerce(balance if opening_balance is None else opening_balance)
+        self.account_type = account_type
+        self.transactions = ledger if ledger is not None else Ledger(opening=self._cents)
+        self.journal = journal
+        self.overdraft_attempts = 0  # postings refused for insufficient funds, kept in the journal's snapshot
+        self.dedup = None  # DedupIndex of keyed postings, created by the first one
+        # Guards balance and ledger; transfers take both accounts' locks in account_id order
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, account_holder, balance=0.0, account_type='Savings', **options):
+        # New journal-backed account; options are passed to Journal (commit_window, snapshot_every)
+        cents = to_cents(balance)
+        meta = {'holder': account_holder, 'account_type': account_type, 'opening': cents}
+        journal = Journal.create(path, meta, cents, **options)
+        return cls(account_holder, Money(cents), account_type, journal=journal)
+
+    @classmethod
+    def open(cls, path, **options):
+        # Startup cost is the snapshot plus the journal tail written after it, not the history length
+        journal, _ = Journal.open(path, **options)
+        ledger = Ledger(journal.view(), journal.count, journal.meta['opening'])
+        account = cls(journal.meta['holder'], Money(journal.balance), journal.meta['account_type'], journal=journal,
+                      ledger=ledger, opening_balance=Money(journal.meta['opening']))
+        account.overdraft_attempts = journal.meta.get('overdraft_attempts', 0)
+        return account
+
+    @property
+    def balance(self):
+        return Money(self._cents)
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.transactions.close()
+
+    def _log(self, many=False):
+        # The journal's append (or append_many) for the ledger to commit new rows through first,
+        # so a failed write leaves neither the ledger nor the balance ahead of the journal
+        if self.journal is None:
+            return None
+        return self.journal.append_many if many else self.journal.append
+
+    def _record(self, kind, cents, when):
+        # Under self.lock; the caller updates self._cents once this returns
+        self.transactions.append(kind, cents, when, log=self._log())
+
+    def _refuse(self, count=1):
+        # Under self.lock: counts postings refused for insufficient funds
+        self.overdraft_attempts += count
+        if self.journal is not None:
+            self.journal.update_meta(overdraft_attempts=self.overdraft_attempts)
+
+    # Postings take an optional request_id that makes them idempotent: repeating a posting with
+    # the same request_id within the dedup window returns the first one's result and posts
+    # nothing. Only completed postings are remembered, so a refused one can be retried.
+    def _replay(self, request_id, fingerprint):
+        # Under self.lock
+        if request_id is None or self.dedup is None:
+            return False, None
+        return self.dedup.get(request_id, fingerprint)
+
+    def _remember(self, request_id, fingerprint, result):
+        # Under self.lock
+        if request_id is not None:
+            if self.dedup is None:
+                self.dedup = DedupIndex()
+            self.dedup.add(request_id, fingerprint, result)
+        return result
+
+    @metrics.timed("account.deposit")
+    def deposit(self, amount, request_id=None):
+        # Returns the balance after the deposit
+        cents = to_cents(amount)
+        if cents <= 0:
+            raise ValueError("Deposit amount must be positive.")
+        with self.lock:
+            done, result = self._replay(request_id, ('Deposit', cents))
+            if done:
+                return result
+            self._record('Deposit', cents, datetime.now())
+            self._cents += cents
+            return self._remember(request_id, ('Deposit', cents), Money(self._cents))
+
+    @metrics.timed("account.withdraw")
+    def withdraw(self, amount, request_id=None):
+        # Returns the balance after the withdrawal
+        cents = to_cents(amount)
+        if cents <= 0:
+            raise ValueError("Withdrawal amount must be positive.")
+        with self.lock:
+            done, result = self._replay(request_id, ('Withdrawal', cents))
+            if done:
+                return result
+            if cents > self._cents:
+                self._refuse()
+                raise ValueError("Insufficient funds.")
+            self._record('Withdrawal', cents, datetime.now())
+            self._cents -= cents
+            return self._remember(request_id, ('Withdrawal', cents), Money(self._cents))
+
+    @metrics.timed("account.apply_batch")
+    def apply_batch(self, records, request_id=None):
+        # Applies (operation, amount) records, e.g. ('deposit', 25.0) or ('withdraw', 10), or the
+        # rows of a structured array with those two fields. Valid rows are committed together with
+        # one timestamp; returns BatchResult(accepted count, [(row index, reason), ...]). A row with
+        # an unknown operation, an amount that is not a number or not positive, or that would
+        # overdraw is rejected on its own.
+        ops, amounts = _batch_columns(records)
+        if not ops:
+            return BatchResult(0, [])
+        kinds = list(map(_BATCH_OPS.get, ops))
+        cents = _batch_cents(amounts)
+        rejected = []
+        indices = None
+        if None in kinds or None in cents or min(cents) <= 0:
+            indices = []
+            for index, (op, kind, value) in enumerate(zip(ops, kinds, cents)):
+                if kind is None:
+                    kind = kinds[index] = _BATCH_OPS.get((op.decode() if isinstance(op, bytes) else str(op)).lower())
+                if kind is None:
+                    rejected.append((index, f"Unknown operation {op!r}."))
+                elif value is None:
+                    rejected.append((index, f"Invalid amount {amounts[index]!r}."))
+                elif value <= 0:
+                    rejected.append((index, f"{kind} amount must be positive."))
+                else:
+                    indices.append(index)
+        # fingerprinted once the operation names are normalized, before invalid rows are dropped
+        fingerprint = None if request_id is None else _batch_fingerprint(kinds, cents)
+        if indices is not None:
+            kinds = [kinds[i] for i in indices]
+            cents = [cents[i] for i in indices]
+        with self.lock:
+            done, result = self._replay(request_id, fingerprint)
+            if done:
+                return result
+            deltas = list(map(mul, map(_TYPE_SIGNS.__getitem__, kinds), cents))
+            keep, overdrawn, end = _validate_running_balance(self._cents, deltas)
+            if overdrawn:
+                self._refuse(len(overdrawn))
+                rejected.extend((indices[i] if indices is not None else i, "Insufficient funds.") for i in overdrawn)
+                kinds = list(itertools.compress(kinds, keep))
+                cents = list(itertools.compress(cents, keep))
+                deltas = list(itertools.compress(deltas, keep))
+            if kinds:
+                self.transactions.extend(kinds, cents, datetime.now(), deltas=deltas, log=self._log(many=True))
+                self._cents = end
+            rejected.sort()
+            return self._remember(request_id, fingerprint, BatchResult(len(kinds), rejected))
+
+    @metrics.timed("account.export_statement")
+    def export_statement(self, path, start=None, end=None, types=None, compress=False):
+        # Streams rows with start <= date < end (and a type in `types`) to CSV for *.csv, gzip'ed
+        # CSV for *.csv.gz, or the columnar statement format; returns the rows written
+        return statement.write(path, self.transactions.chunks(start, end, types),
+                               list(TXN_TYPES), list(TXN_STATUSES), compress)
+
+    @metrics.timed("account.import_statement")
+    def import_statement(self, path):
+        # Posts the rows of an exported statement on top of the current balance, one chunk per
+        # commit, and returns the number imported. Rows keep their dates; a row dated before the
+        # account's latest transaction, one with a type or status this ledger does not know, or
+        # one that would overdraw stops the import.
+        imported = 0
+        for chunk in statement.read(path):
+            type_codes = [_TYPE_CODES.get(name) for name in chunk.type_names]
+            status_codes = [_STATUS_CODES.get(name) for name in chunk.status_names]
+            for what, codes, column, names in (("type", type_codes, chunk.kinds, chunk.type_names),
+                                               ("status", status_codes, chunk.statuses, chunk.status_names)):
+                unknown = {code for code, value in enumerate(codes) if value is None}
+                bad = next((i for i, code in enumerate(column) if code in unknown), None) if unknown else None
+                if bad is not None:
+                    raise ValueError(f"Statement row {imported + bad + 1} has an unknown transaction {what} "
+                                     f"{names[column[bad]]!r}; {imported} rows were imported.")
+            kinds = array('B', map(type_codes.__getitem__, chunk.kinds))
+            statuses = array('B', map(status_codes.__getitem__, chunk.statuses))
+            signs = {code: _TYPE_SIGNS.get(TXN_TYPES[code], 0) for code in set(kinds)}
+            with self.lock:
+                bad = self.transactions.out_of_order(chunk.micros)
+                if bad is not None:
+                    raise ValueError(f"Statement row {imported + bad + 1} is dated {from_micros(chunk.micros[bad])}, "
+                                     f"before the account's transaction preceding it; {imported} rows were imported.")
+                deltas = list(map(mul, map(signs.__getitem__, kinds), chunk.cents))
+                _, overdrawn, end = _validate_running_balance(self._cents, deltas)
+                if overdrawn:
+                    raise ValueError(f"Statement row {imported + overdrawn[0] + 1} would overdraw the account; "
+                                     f"{imported} rows were imported.")
+                self.transactions.load(kinds, chunk.cents, chunk.micros, statuses, log=self._log(many=True))
+                self._cents = end
+            imported += len(kinds)
+        return imported
+
+    @metrics.timed("account.transfer")
+    def transfer(self, amount, to_account, request_id=None):
+        # Debits this account and credits to_account under both accounts' locks, so no other
+        # thread sees one without the other; returns both balances after. The request_id is
+        # remembered by this (the source) account. On disk the debit and the credit are separate
+        # commits to two journals: if the credit cannot be written the debit is reversed with a
+        # Transfer Received entry, but a crash between the two commits leaves the debit without
+        # the credit, and nothing reconciles the pair on reopen.
+        cents = to_cents(amount)
+        if cents <= 0:
+            raise ValueError("Transfer amount must be positive.")
+        if to_account is self:
+            raise ValueError("Cannot transfer to the same account.")
+        first, second = sorted((self, to_account), key=lambda a: a.account_id)
+        with first.lock, second.lock:
+            fingerprint = ('Transfer', cents, to_account.account_id)
+            done, result = self._replay(request_id, fingerprint)
+            if done:
+                return result
+            if cents > self._cents:
+                self._refuse()
+                raise ValueError("Insufficient funds.")
+            now = datetime.now()
+            self._record('Transfer Sent', cents, now)
+            self._cents -= cents
+            try:
+                to_account._record('Transfer Received', cents, now)
+            except Exception:
+                # the debit is committed already: return the money rather than lose it
+                self._record('Transfer Received', cents, now)
+                self._cents += cents
+                raise
+            to_account._cents += cents
+            return self._remember(request_id, fingerprint, (Money(self._cents), Money(to_account._cents)))
+
+    def info(self):
+        return {
+            'Account Holder': self.account_holder,
+            'Account Type': self.account_type,
+            'Balance': f"${self.balance:,.2f}"
+        }
+
+    def all_transactions(self):
+        return self.transactions
+
+    def query(self, start=None, end=None, types=None, newest_first=False):
+        # Lazy iterator of (type, amount, datetime, status) rows with start <= date < end,
+        # optionally limited to some transaction types, e.g. query(march, april, 'Withdrawal')
+        return self.transactions.query(start, end, types, newest_first=newest_first)
+
+    def balance_at(self, when):
+        return self.transactions.balance_at(when)
+
+    def totals(self, start=None, end=None):
+        return self.transactions.totals(start, end)
+
+    def monthly_statement(self, start=None, end=None):
+        return self.transactions.monthly(start, end)
+
+    def page(self, limit=50, cursor=None, start=None, end=None, types=None, newest_first=False):
+        # One page of query() results plus the cursor for the next page (None after the last one)
+        positions = self.transactions.positions(start, end, types, cursor, newest_first)
+        indices = list(itertools.islice(positions, limit + 1))
+        next_cursor = indices[limit - 1] if len(indices) > limit else None
+        return [self.transactions.row(i) for i in indices[:limit]], next_cursor
+
+def _batch_columns(records):
+    names = getattr(getattr(records, 'dtype', None), 'names', None)
+    if names:
+        # Structured array: pull each field out as a whole column
+        return records[names[0]].tolist(), records[names[1]].tolist()
+    if not isinstance(records, (list, tuple)):
+        records = list(records)
+    return list(map(itemgetter(0), records)), list(map(itemgetter(1), records))
+
+def _batch_cents(amounts):
+    # Integer cents per amount as to_cents() gives them, None where an amount cannot be
+    # converted. Columns of plain ints and floats are converted in one C-level pass.
+    if set(map(type, amounts)) <= _PLAIN_NUMBERS:
+        try:
+            return list(map(round, map(mul, amounts, itertools.repeat(100))))
+        except (ValueError, OverflowError):
+            pass  # a NaN or an infinity: find it row by row
+    cents = []
+    for amount in amounts:
+        try:
+            cents.append(to_cents(amount))
+        except (TypeError, ValueError, ArithmeticError):
+            cents.append(None)
+    return cents
+
+def _batch_fingerprint(kinds, cents):
+    # A strong digest rather than hash(): a different batch must never replay as this one
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(kinds).encode())
+    digest.update(repr(cents).encode())
+    return ('Batch', len(kinds), digest.digest())
+
+def _validate_running_balance(balance, deltas):
+    # Prefix sums of the deltas give the running balance; a row that would take it below zero is
+    # rejected and the scan resumes after it. Returns (keep flags, rejected positions, end balance).
+    keep = None
+    overdrawn = []
+    start = 0
+    while start < len(deltas):
+        stop = min(start + _BATCH_CHUNK, len(deltas))
+        running = list(itertools.accumulate(deltas[start:stop], initial=balance))
+        if min(running) >= 0:
+            balance = running[-1]
+            start = stop
+            continue
+        # running minimum never increases, so the first negative entry is found by bisection
+        first = bisect_right(list(itertools.accumulate(running, min)), 0, key=neg) - 1
+        if keep is None:
+            keep = [True] * len(deltas)
+        keep[start + first] = False
+        overdrawn.append(start + first)
+        balance = running[first]
+        start += first + 1
+    return keep, overdrawn, balance
+
+class Bank:
+    # Registry of accounts indexed by account ID and by holder name. With a data_dir, accounts
+    # are journal-backed and a holder not yet in memory is reopened from disk on lookup;
+    # journal_options (commit_window, snapshot_every) are passed to every account's Journal.
+    def __init__(self, data_dir=None, **journal_options):
+        self.data_dir = data_dir
+        self.journal_options = journal_options
+        self._accounts = {}
+        self._holders = {}
+        self._lock = threading.Lock()  # guards the indexes only; postings use account locks
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __iter__(self):
+        return iter(list(self._accounts.values()))
+
+    def _register(self, account):
+        self._accounts[account.account_id] = account
+        self._holders[holder_key(account.account_holder)] = account.account_id
+        return account
+
+    def get(self, account_id):
+        account = self._accounts.get(account_id)
+        if account is None:
+            raise KeyError(f"No account with ID {account_id}.")
+        return account
+
+    def find(self, holder):
+        with self._lock:
+            return self._find_locked(holder)
+
+    def _find_locked(self, holder):
+        account_id = self._holders.get(holder_key(holder))
+        if account_id is not None:
+            return self._accounts[account_id]
+        if self.data_dir:
+            key = holder_key(holder)
+            paths = dict.fromkeys((account_path(holder, self.data_dir), _legacy_account_path(holder, self.data_dir)))
+            for path in paths:
+                if os.path.exists(path) and holder_key(read_meta(path)['holder']) == key:
+                    try:
+                        return self._register(BankAccount.open(path, **self.journal_options))
+                    except BlockingIOError:
+                        # its journal is locked by another Bank: the GUI, a server or a script
+                        raise ValueError(f"The account for {holder} is open in another session; "
+                                         f"close it there first.") from None
+        return None
+
+    def open_account(self, holder, balance=0.0, account_type='Savings'):
+        # The same rules as the login page: a holder name, a known account type and an opening
+        # balance that is not negative
+        if not isinstance(holder, str) or not holder.strip():
+            raise ValueError("Account holder name is required.")
+        if account_type not in ACCOUNT_TYPES:
+            raise ValueError(f"Unknown account type: {account_type!r}.")
+        balance = Money(to_cents(balance))
+        if balance < 0:
+            raise ValueError("Opening balance cannot be negative.")
+        with self._lock:
+            if self._find_locked(holder) is not None:
+                raise ValueError(f"An account for {holder} already exists.")
+            if self.data_dir:
+                account = BankAccount.create(account_path(holder, self.data_dir), holder, balance, account_type,
+                                             **self.journal_options)
+            else:
+                account = BankAccount(holder, balance, account_type)
+            return self._register(account)
+
+    def resolve(self, account):
+        # Accepts an account, an account ID or a holder name
+        if isinstance(account, BankAccount):
+            return account
+        if isinstance(account, int):
+            return self.get(account)
+        found = self.find(account)
+        if found is None:
+            raise ValueError(f"No account found for {account}.")
+        return found
+
+    def transfer(self, source, target, amount, request_id=None):
+        source = self.resolve(source)
+        target = self.resolve(target)
+        source.transfer(amount, target, request_id)
+        return source, target
+
+    def total_balance(self):
+        return Money(sum(account.balance.cents for account in self))
+
+    def close(self):
+        for account in self:
+            account.close()
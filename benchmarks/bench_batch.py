@@ -0,0 +1,56 @@
+# apply_batch versus one deposit()/withdraw() call per operation, in memory and journal-backed.
+# Usage: python -m benchmarks.bench_batch [operations]   (default: 1000000)
+import os
+import random
+import sys
+import tempfile
+import time
+
+from banking import BankAccount
+
+JOURNALED_PER_CALL = 20_000  # fsync per posting; measured on a prefix and reported as a rate
+
+def make_ops(n, seed=5):
+    rng = random.Random(seed)
+    return [('deposit' if rng.random() < 0.6 else 'withdraw', rng.randint(100, 50_000) / 100) for _ in range(n)]
+
+def per_call(account, ops):
+    for op, amount in ops:
+        try:
+            if op == 'deposit':
+                account.deposit(amount)
+            else:
+                account.withdraw(amount)
+        except ValueError:
+            pass
+    return account
+
+def batched(account, ops):
+    account.apply_batch(ops)
+    return account
+
+def rate(fn, account, ops):
+    start = time.perf_counter()
+    fn(account, ops)
+    rate = len(ops) / (time.perf_counter() - start)
+    account.close()
+    return rate, account
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    ops = make_ops(n)
+    single, a = rate(per_call, BankAccount("PerCall", 1000.0), ops)
+    batch, b = rate(batched, BankAccount("Batch", 1000.0), ops)
+    assert len(a.transactions) == len(b.transactions)
+    assert a.balance == b.balance
+    print(f"in memory, {n:,} ops: per-call {single:,.0f} ops/s, apply_batch {batch:,.0f} ops/s, "
+          f"speedup {batch / single:.1f}x")
+    with tempfile.TemporaryDirectory() as directory:
+        single, _ = rate(per_call, BankAccount.create(os.path.join(directory, "c.journal"), "PerCall", 1000.0),
+                         ops[:JOURNALED_PER_CALL])
+        batch, _ = rate(batched, BankAccount.create(os.path.join(directory, "b.journal"), "Batch", 1000.0), ops)
+    print(f"journaled, {n:,} ops: per-call {single:,.0f} ops/s, apply_batch {batch:,.0f} ops/s, "
+          f"speedup {batch / single:.1f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,66 @@
+# Idempotent postings: the cost a request_id adds to a deposit, and the dedup index's memory
+# under sustained load, which must stay flat once it holds `capacity` keys. Expiry and collision
+# behaviour is covered by tests/test_dedup.py.
+# Usage: python -m benchmarks.bench_dedup [postings] [capacity]   (default: 1000000, 65536)
+import sys
+import time
+import tracemalloc
+
+from banking import BankAccount, DedupIndex, Money
+
+OVERHEAD_POSTINGS = 200_000
+REPEAT = 3
+
+def per_posting(keys):
+    # Best of REPEAT runs, each on a fresh account
+    best = None
+    for _ in range(REPEAT):
+        deposit = BankAccount("Dedup Bench", 0.0).deposit
+        start = time.perf_counter()
+        for key in keys:
+            deposit(1, key)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(keys)
+
+def sustained(postings, capacity, traced=False):
+    # Adds `postings` distinct keys; returns (adds per second, keys held), or with traced=True
+    # the bytes traced after 2 * capacity adds (the dict's table has reached its steady size by
+    # then) and at the end
+    index = DedupIndex(capacity=capacity)
+    keys = [f"req-{i:012d}" for i in range(postings)]
+    result = Money(100)
+    if traced:
+        tracemalloc.start()
+    full = None
+    warm = min(2 * capacity, postings - 1)
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        index.add(key, ("Deposit", 100), result)
+        if traced and i == warm:
+            full = tracemalloc.get_traced_memory()[0]
+    elapsed = time.perf_counter() - start
+    if not traced:
+        return postings / elapsed, len(index)
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return full, end
+
+def main(argv):
+    postings = int(argv[0]) if len(argv) > 0 else 1_000_000
+    capacity = int(argv[1]) if len(argv) > 1 else 65_536
+    n = OVERHEAD_POSTINGS
+    plain = per_posting([None] * n)
+    unique = per_posting([f"req-{i:012d}" for i in range(n)])
+    repeated = per_posting(["req-repeated"] * n)
+    print(f"{'deposit':<24} {'us/posting':>10} {'overhead':>9}")
+    for name, cost in (("no request_id", plain), ("unique request_ids", unique), ("repeated request_id", repeated)):
+        print(f"{name:<24} {cost * 1e6:>10.2f} {(cost - plain) * 1e6:>+8.2f}")
+
+    rate, held = sustained(postings, capacity)
+    full, end = sustained(postings, capacity, traced=True)
+    print(f"{postings:,} keyed adds, capacity {capacity:,}: {rate:,.0f} adds/s, {held:,} keys held at the end")
+    print(f"traced memory when full {full / 2**20:.1f} MiB, after all adds {end / 2**20:.1f} MiB")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
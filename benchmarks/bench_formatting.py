@@ -0,0 +1,77 @@
+# Row formatting for the history table and passbook: the old per-row datetime + strftime
+# formatting against the batch formatter, then browsing both views back and forth and posting
+# with both refreshing, with and without the shared LRU formatting cache.
+# Usage: python -m benchmarks.bench_formatting [rows]   (default: 100000)
+import sys
+import time
+from datetime import datetime
+
+from Code1 import PassbookRenderer, TransactionHistoryView
+from benchmarks import workloads
+from benchmarks.tk_stubs import StubCanvas, StubScrollbar, StubTreeview
+from formatting import CACHE_ROWS, RowCache, history_rows, passbook_rows
+
+ACTIONS = 500
+BROWSE_PAGES = 200
+
+def legacy_history_row(ledger, i):
+    t = ledger[i]
+    return t[0], f"${t[1]:,.2f}", t[2].strftime("%Y-%m-%d %H:%M:%S"), t[3]
+
+def legacy_passbook_row(ledger, i):
+    t = ledger.row(i)
+    return (t[2].strftime("%Y-%m-%d %H:%M"), t[0], f"${t[1]:,.2f}", f"${ledger.balance_after(i):,.2f}", t[3])
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def browse(view, renderer, pages):
+    # Page the history down and back up, then the passbook older and back newer
+    for offset in list(range(0, pages * view.rows, view.rows)) + list(range(pages * view.rows, -1, -view.rows)):
+        view.scroll_to(offset)
+    for _ in range(pages):
+        renderer.older()
+    for _ in range(pages):
+        renderer.newer()
+
+def main(argv):
+    n = int(argv[0]) if argv else 100_000
+    ledger = workloads.ledger(n, seed=1)
+    indices = range(n - 1, -1, -1)
+    print(f"{n:,} rows")
+    print(f"{'format all rows':<28} {'legacy s':>9} {'batch s':>9} {'speedup':>8}")
+    for name, legacy, batch in (("history", legacy_history_row, history_rows),
+                                ("passbook", legacy_passbook_row, passbook_rows)):
+        old, expected = timed(lambda: [legacy(ledger, i) for i in indices])
+        new, rows = timed(lambda: batch(ledger, indices))
+        assert rows == expected
+        print(f"{name:<28} {old:>9.3f} {new:>9.3f} {old / new:>7.1f}x")
+
+    print(f"{'browse ' + str(BROWSE_PAGES) + ' pages and back':<28} {'seconds':>9} {'hit rate':>9}")
+    for name, capacity in (("no cache", 0), ("LRU cache", CACHE_ROWS)):
+        cache = RowCache(capacity)
+        view = TransactionHistoryView(StubTreeview(), StubScrollbar(), cache=cache)
+        renderer = PassbookRenderer(StubCanvas(), cache=cache)
+        view.refresh(ledger)
+        renderer.show(ledger)
+        elapsed, _ = timed(lambda: browse(view, renderer, BROWSE_PAGES))
+        print(f"{name:<28} {elapsed:>9.3f} {cache.stats()['hit_rate']:>9.1%}")
+
+    cache = RowCache()
+    view = TransactionHistoryView(StubTreeview(), StubScrollbar(), cache=cache)
+    renderer = PassbookRenderer(StubCanvas(), cache=cache)
+    view.refresh(ledger)
+    renderer.show(ledger)
+    now = datetime.now()
+    start = time.perf_counter()
+    for _ in range(ACTIONS):
+        ledger.append('Deposit', 2500, now)
+        view.refresh(ledger)
+        renderer.show(ledger)
+    per_action = (time.perf_counter() - start) / ACTIONS
+    print(f"post + refresh both views: {per_action * 1e6:.1f} us/posting")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
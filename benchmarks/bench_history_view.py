@@ -0,0 +1,60 @@
+# Per-action cost of keeping the Dashboard history table current as the ledger grows.
+# Uses a real Treeview when a display is available, otherwise counting stubs.
+# Usage: python -m benchmarks.bench_history_view [history sizes ...]   (default: 1k 10k 100k 1M)
+import sys
+import time
+from datetime import datetime, timedelta
+
+from Code1 import TransactionHistoryView
+from banking import Ledger
+from benchmarks.tk_stubs import StubScrollbar, StubTreeview, real_tk_root
+
+ACTIONS = 200
+LEGACY_LIMIT = 10_000  # the old full rebuild is O(history); skip it beyond this size
+
+def make_widgets(root):
+    if root is None:
+        return StubTreeview(), StubScrollbar()
+    from tkinter import ttk
+    tree = ttk.Treeview(root, columns=("Type", "Amount", "Date", "Status"), show='headings', height=15)
+    return tree, ttk.Scrollbar(root, orient='vertical')
+
+def fill(ledger, n):
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        ledger.append('Deposit' if i % 2 else 'Withdrawal', 1000 + i % 10000, start + timedelta(seconds=i))
+
+def legacy_refresh(tree, ledger):
+    tree.delete(*tree.get_children())
+    for t in reversed(ledger):
+        dt_str = t[2].strftime("%Y-%m-%d %H:%M:%S")
+        tree.insert("", "end", values=(t[0], f"${t[1]:,.2f}", dt_str, t[3]))
+
+def per_action(refresh, ledger, actions):
+    now = datetime.now()
+    start = time.perf_counter()
+    for _ in range(actions):
+        ledger.append('Deposit', 2500, now)
+        refresh()
+    return (time.perf_counter() - start) / actions
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1_000, 10_000, 100_000, 1_000_000]
+    root = real_tk_root()
+    print(f"widgets: {'Tk' if root else 'stubs (no display)'}")
+    print(f"{'history':>10} {'virtual us/action':>18} {'legacy us/action':>17}")
+    for n in sizes:
+        ledger = Ledger()
+        fill(ledger, n)
+        tree, scrollbar = make_widgets(root)
+        view = TransactionHistoryView(tree, scrollbar)
+        view.refresh(ledger)
+        virtual = per_action(lambda: view.refresh(ledger), ledger, ACTIONS)
+        legacy = "-"
+        if n <= LEGACY_LIMIT:
+            tree, _ = make_widgets(root)
+            legacy = f"{per_action(lambda: legacy_refresh(tree, ledger), ledger, 5) * 1e6:,.0f}"
+        print(f"{n:>10,} {virtual * 1e6:>18,.1f} {legacy:>17}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
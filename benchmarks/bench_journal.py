@@ -0,0 +1,59 @@
+# Journal write throughput per group-commit window and account open time versus history length.
+# Crash recovery is covered by tests/test_journal.py.
+# Usage: python -m benchmarks.bench_journal [history sizes ...]   (default: 10k 1M 10M)
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from banking import BankAccount
+
+WINDOWS = [0.0, 0.001, 0.01, 0.1]
+CHUNK = 100_000
+
+def write_throughput(directory, window, seconds=1.0):
+    account = BankAccount.create(os.path.join(directory, f"w{window}.journal"), "Bench", 0.0,
+                                 commit_window=window)
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        account.deposit(1.0)
+        n += 1
+    account.close()
+    return n / (time.perf_counter() - start)
+
+def build_history(path, n):
+    account = BankAccount.create(path, "Bench", 0.0)
+    micros = int(datetime(2024, 1, 1).timestamp() * 1e6)
+    done = 0
+    while done < n:
+        size = min(CHUNK, n - done)
+        account.journal.append_many((micros + i, 100, 100 * (i + 1), 0, 0) for i in range(done, done + size))
+        done += size
+    account.close()
+
+def open_time(path, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        account = BankAccount.open(path)
+        best = min(best, time.perf_counter() - start)
+        account.close()
+    return best
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [10_000, 1_000_000, 10_000_000]
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'commit window s':>16} {'deposits/s':>12}")
+        for window in WINDOWS:
+            print(f"{window:>16} {write_throughput(directory, window):>12,.0f}")
+        print(f"{'history':>12} {'open ms':>8}")
+        for n in sizes:
+            path = os.path.join(directory, f"h{n}.journal")
+            build_history(path, n)
+            print(f"{n:>12,} {open_time(path) * 1e3:>8.2f}")
+            os.remove(path)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+# Memory used by the columnar Ledger versus the old list of (type, float, datetime, status) tuples.
+# Usage: python -m benchmarks.bench_ledger_memory [rows ...]   (default: 1000000 10000000)
+import gc
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+from banking import Ledger, TXN_TYPES
+
+def _rows(n):
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        yield TXN_TYPES[i % 2], i % 50000 + 1, start + timedelta(microseconds=i * 1000)
+
+def measure(build, n):
+    gc.collect()
+    tracemalloc.start()
+    store = build(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    gc.collect()
+    return current
+
+def build_list(n):
+    txns = []
+    for kind, cents, when in _rows(n):
+        txns.append((kind, cents / 100, when, 'Completed'))
+    return txns
+
+def build_ledger(n):
+    ledger = Ledger()
+    for kind, cents, when in _rows(n):
+        ledger.append(kind, cents, when)
+    return ledger
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1_000_000, 10_000_000]
+    print(f"{'rows':>12} {'list MiB':>10} {'ledger MiB':>11} {'B/row list':>11} {'B/row ledger':>13} {'ratio':>6}")
+    for n in sizes:
+        list_bytes = measure(build_list, n)
+        ledger_bytes = measure(build_ledger, n)
+        print(f"{n:>12,} {list_bytes / 2**20:>10.1f} {ledger_bytes / 2**20:>11.1f} "
+              f"{list_bytes / n:>11.1f} {ledger_bytes / n:>13.1f} {list_bytes / ledger_bytes:>6.1f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+# Cost of the metrics layer with BANK_METRICS off and on: a decorated no-op function, the
+# timer() context manager and BankAccount.deposit. Each mode runs in its own interpreter
+# since the switch is read at import time.
+# Usage: python -m benchmarks.bench_metrics [calls]   (default: 1000000)
+import os
+import subprocess
+import sys
+import time
+
+def bare():
+    pass
+
+def per_call(func, calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter_ns() - start) / calls
+
+def child(calls):
+    import metrics
+    from banking import BankAccount
+    decorated = metrics.timed("bench.noop")(bare)
+
+    def timer_block():
+        with metrics.timer("bench.block"):
+            pass
+
+    account = BankAccount("Bench", 0.0)
+    base = per_call(bare, calls)
+    if not metrics.ENABLED:
+        print(f"unchanged function when disabled: {decorated is bare}")
+    print(f"{'decorated no-op':<18} {per_call(decorated, calls) - base:>8.1f} ns/call over a bare call")
+    print(f"{'timer() block':<18} {per_call(timer_block, calls) - base:>8.1f} ns/call over a bare call")
+    print(f"{'deposit':<18} {per_call(lambda: account.deposit(1), calls):>8.1f} ns/call")
+    if metrics.ENABLED:
+        print(metrics.snapshot(), end="")
+
+def main(argv):
+    calls = argv[0] if argv else "1000000"
+    for enabled in ("0", "1"):
+        print(f"--- BANK_METRICS={enabled}")
+        env = dict(os.environ, BANK_METRICS=enabled)
+        code = f"from benchmarks.bench_metrics import child; child({int(calls)})"
+        subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,77 @@
+# Cold open and last-15-rows access on a large journal: the mmap'ed JournalView against
+# seek/read/unpack per record. Each measurement runs in a fresh process after asking the OS
+# to drop the file from the page cache (posix_fadvise), so opens start cold.
+# Usage: python -m benchmarks.bench_mmap [gigabytes] [directory]   (default: 5 GB in a temp dir)
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime
+
+from journal import RECORD_SIZE, Journal, _write_snapshot
+
+CHUNK = 1 << 20
+MICROS = int((datetime(2024, 1, 1) - datetime(1970, 1, 1)).total_seconds() * 1e6)
+
+def build(path, n):
+    # Records are laid out directly as int64 words; CRCs stay zero since views never check them
+    journal = Journal.create(path, {'holder': 'Bench', 'account_type': 'Savings', 'opening': 0}, 0)
+    journal.close()
+    with open(path, "wb") as f:
+        for lo in range(0, n, CHUNK):
+            size = min(CHUNK, n - lo)
+            words = array('q', bytes(RECORD_SIZE * size))
+            words[0::4] = array('q', range(MICROS + lo * 1000, MICROS + (lo + size) * 1000, 1000))
+            words[1::4] = array('q', [100]) * size
+            words[2::4] = array('q', range((lo + 1) * 100, (lo + size + 1) * 100, 100))
+            f.write(words.tobytes())
+    _write_snapshot(path + ".snap", {'holder': 'Bench', 'account_type': 'Savings', 'opening': 0,
+                                     'count': n, 'balance': n * 100})
+
+def evict(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+# name: (imports, open, read the last 15 rows); only the last two are timed
+PROBES = {
+    "mmap view": ("from journal import JournalView",
+                  "view = JournalView(PATH)",
+                  "rows = [view.read(i) for i in range(len(view) - 15, len(view))]"),
+    "account open": ("from banking import BankAccount",
+                     "account = BankAccount.open(PATH)",
+                     "rows = account.transactions[-15:]"),
+    "seek+unpack": ("import os\nfrom journal import RECORD, RECORD_SIZE",
+                    "f = open(PATH, 'rb')\nn = os.fstat(f.fileno()).st_size // RECORD_SIZE",
+                    "rows = []\nfor i in range(n - 15, n):\n"
+                    "    f.seek(i * RECORD_SIZE)\n    rows.append(RECORD.unpack(f.read(RECORD_SIZE)))"),
+}
+
+def probe(path, name):
+    imports, open_code, rows_code = PROBES[name]
+    code = "\n".join(["import time", imports, f"PATH = {path!r}", "start = time.perf_counter()", open_code,
+                      "opened = time.perf_counter()", rows_code, "print(opened - start, time.perf_counter() - opened)"])
+    evict(path)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return map(float, out.stdout.split())
+
+def main(argv):
+    gigabytes = float(argv[0]) if argv else 5.0
+    n = int(gigabytes * 1e9) // RECORD_SIZE
+    with tempfile.TemporaryDirectory(dir=argv[1] if len(argv) > 1 else None) as tmp:
+        path = os.path.join(tmp, "big.journal")
+        start = time.perf_counter()
+        build(path, n)
+        print(f"{n:,} records, {os.path.getsize(path) / 1e9:.1f} GB, built in {time.perf_counter() - start:.0f} s")
+        print(f"{'reader':>13} {'cold open ms':>13} {'last 15 rows ms':>16}")
+        for name in PROBES:
+            opened, rows = probe(path, name)
+            print(f"{name:>13} {opened * 1e3:>13.2f} {rows * 1e3:>16.3f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+# Integer-cent Money versus Decimal (and float) for parsing, posting and formatting. The
+# balance-equals-ledger property is covered by tests/test_money.py.
+# Usage: python -m benchmarks.bench_money [operations]   (default: 1000000)
+import random
+import sys
+import time
+from decimal import Decimal
+
+from banking import BankAccount, Money
+
+def make_inputs(n, seed=6):
+    rng = random.Random(seed)
+    return [(rng.random() < 0.6, f"{rng.randint(1, 99_999)}.{rng.randint(0, 99):02d}") for _ in range(n)]
+
+def post(amounts, balance, zero):
+    # The deposit/withdraw kernel: positive check, overdraft check, balance update
+    for is_deposit, amount in amounts:
+        if amount <= zero:
+            continue
+        if is_deposit:
+            balance += amount
+        elif amount <= balance:
+            balance -= amount
+    return balance
+
+def post_money_cents(amounts, balance):
+    return post(amounts, balance, 0)
+
+def post_account(amounts):
+    account = BankAccount("Bench", 1000)
+    for is_deposit, amount in amounts:
+        try:
+            account.deposit(amount) if is_deposit else account.withdraw(amount)
+        except ValueError:
+            pass
+    return account
+
+def format_all(values):
+    return [f"{v:,.2f}" for v in values]
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed * 1e3:>9.1f} ms")
+    return elapsed
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    inputs = make_inputs(n)
+    as_float = [(d, float(t)) for d, t in inputs]
+    as_decimal = [(d, Decimal(t)) for d, t in inputs]
+    as_cents = [(d, Money.parse(t).cents) for d, t in inputs]
+    as_money = [(d, Money.parse(t)) for d, t in inputs]
+    print(f"{n:,} operations")
+    print("parse")
+    timed("float", lambda: [float(t) for _, t in inputs])
+    timed("Decimal", lambda: [Decimal(t) for _, t in inputs])
+    timed("Money.parse", lambda: [Money.parse(t) for _, t in inputs])
+    print("post (deposit/withdraw kernel)")
+    timed("float", post, as_float, 1000.0, 0.0)
+    decimal = timed("Decimal", post, as_decimal, Decimal("1000.00"), Decimal(0))
+    cents = timed("Money cents", post, as_cents, 100_000, 0)
+    print("format")
+    timed("Decimal", format_all, [a for _, a in as_decimal])
+    timed("Money", format_all, [a for _, a in as_money])
+    print("BankAccount")
+    account = timed("deposit/withdraw, Money", post_account, as_money)
+    print(f"Money kernel vs Decimal: {decimal / cents:.2f}x; account path {n / account:,.0f} ops/s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
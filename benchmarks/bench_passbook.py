@@ -0,0 +1,73 @@
+# Per-refresh cost of the passbook canvas as the ledger grows: the retained-mode renderer
+# against the old delete-all-and-redraw. Uses a real Canvas when a display is available,
+# otherwise counting stubs.
+# Usage: python -m benchmarks.bench_passbook [history sizes ...]   (default: 1k 10k 100k 1M)
+import itertools
+import sys
+import time
+from datetime import datetime
+
+from Code1 import FONT_MONO, TEXT_PRIMARY, TEXT_SECONDARY, PassbookRenderer, round_rectangle
+from banking import Ledger
+from benchmarks.bench_history_view import fill
+from benchmarks.tk_stubs import StubCanvas, real_tk_root
+
+ACTIONS = 200
+
+def make_canvas(root):
+    if root is None:
+        return StubCanvas()
+    import tkinter as tk
+    return tk.Canvas(root, width=950, height=600)
+
+def legacy_draw(c, ledger):
+    c.delete("all")
+    w, h = int(c['width']), int(c['height'])
+    round_rectangle(c, 5, 5, w - 5, h - 5, fill='white')
+    c.create_text(w // 2, 40, text="Passbook", fill=TEXT_PRIMARY)
+    positions = [80, 280, 560, 720, 770]
+    for pos, htext in zip(positions, ["Date", "Type", "Amount", "Balance", "Status"]):
+        c.create_text(pos, 90, text=htext, fill=TEXT_SECONDARY)
+    y = 140
+    for i in itertools.islice(ledger.positions(newest_first=True), 15):
+        t = ledger.row(i)
+        c.create_text(positions[0], y, text=t[2].strftime("%Y-%m-%d %H:%M"), anchor='w', font=FONT_MONO)
+        c.create_text(positions[1], y, text=t[0], anchor='w', font=FONT_MONO)
+        c.create_text(positions[2], y, text=f"${t[1]:,.2f}", anchor='e', font=FONT_MONO)
+        c.create_text(positions[3], y, text=f"${ledger.balance_after(i):,.2f}", anchor='e', font=FONT_MONO)
+        c.create_text(positions[4], y, text=t[3], anchor='w', font=FONT_MONO)
+        y += 30
+    c.create_line(50, h - 70, w - 50, h - 70, fill=TEXT_SECONDARY, width=2)
+    c.create_text(w // 2, h - 40, text="End of Passbook Preview", fill=TEXT_SECONDARY)
+
+def per_action(refresh, ledger, actions):
+    now = datetime.now()
+    start = time.perf_counter()
+    for _ in range(actions):
+        ledger.append('Deposit', 2500, now)
+        refresh()
+    return (time.perf_counter() - start) / actions
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1_000, 10_000, 100_000, 1_000_000]
+    root = real_tk_root()
+    print(f"widgets: {'Tk' if root else 'stubs (no display)'}")
+    print(f"{'history':>10} {'retained us':>12} {'Tk calls':>9} {'page us':>8} {'legacy us':>10} {'Tk calls':>9}")
+    for n in sizes:
+        ledger = Ledger()
+        fill(ledger, n)
+        renderer = PassbookRenderer(make_canvas(root))
+        renderer.show(ledger)
+        retained = per_action(renderer.refresh, ledger, ACTIONS)
+        calls = renderer.last_refresh_calls
+        start = time.perf_counter()
+        for _ in range(ACTIONS // 2):
+            renderer.older()
+        paging = (time.perf_counter() - start) / (ACTIONS // 2)
+        canvas = make_canvas(root)
+        legacy = per_action(lambda: legacy_draw(canvas, ledger), ledger, ACTIONS)
+        legacy_calls = canvas.calls // ACTIONS if root is None else "-"
+        print(f"{n:>10,} {retained * 1e6:>12,.1f} {calls:>9} {paging * 1e6:>8,.1f} {legacy * 1e6:>10,.1f} {legacy_calls:>9}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+# Indexed date-range/type queries and prefix-sum aggregates versus linear scans of the ledger.
+# Usage: python -m benchmarks.bench_query [rows]   (default: 10000000)
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from banking import Ledger, to_micros, _TYPE_CODES
+
+CHUNK = 1000  # rows per synthetic minute
+QUERIES = 50
+
+def build(n):
+    ledger = Ledger()
+    start = datetime(2020, 1, 1)
+    kinds = ['Deposit', 'Withdrawal', 'Deposit', 'Transfer Sent', 'Transfer Received'] * (CHUNK // 5)
+    amounts = list(range(100, 100 + CHUNK))
+    for minute in range(n // CHUNK):
+        ledger.extend(kinds, amounts, start + timedelta(minutes=minute))
+    return ledger, start, start + timedelta(minutes=n // CHUNK)
+
+def linear(ledger, lo, hi, code):
+    ts, kinds = ledger.timestamps, ledger.kinds
+    return [i for i in range(len(ts)) if lo <= ts[i] < hi and kinds[i] == code]
+
+def main(argv):
+    n = int(argv[0]) if argv else 10_000_000
+    t = time.perf_counter()
+    ledger, first, last = build(n)
+    print(f"built {len(ledger):,} rows in {time.perf_counter() - t:.1f}s")
+    rng = random.Random(3)
+    span = (last - first) // 30
+    ranges = []
+    for _ in range(QUERIES):
+        start = first + (last - first - span) * rng.random()
+        ranges.append((start, start + span))
+
+    t = time.perf_counter()
+    indexed = [sum(1 for _ in ledger.positions(s, e, 'Withdrawal')) for s, e in ranges]
+    index_time = (time.perf_counter() - t) / QUERIES
+    t = time.perf_counter()
+    pages = [ledger.positions(s, e, 'Withdrawal') for s, e in ranges]
+    first_pages = [[next(p, None) for _ in range(50)] for p in pages]
+    page_time = (time.perf_counter() - t) / QUERIES
+
+    code = _TYPE_CODES['Withdrawal']
+    scans = ranges[:3]
+    t = time.perf_counter()
+    scanned = [len(linear(ledger, to_micros(s), to_micros(e), code)) for s, e in scans]
+    scan_time = (time.perf_counter() - t) / len(scans)
+    assert scanned == indexed[:3], (scanned, indexed[:3])
+    assert all(first_pages)
+    print(f"withdrawals in a {span} window (~{sum(indexed) // QUERIES:,} rows):")
+    print(f"  indexed, first page of 50  {page_time * 1e6:>12,.0f} us")
+    print(f"  indexed, full iteration    {index_time * 1e3:>12,.1f} ms")
+    print(f"  linear scan                {scan_time * 1e3:>12,.1f} ms")
+
+    t = time.perf_counter()
+    for s, e in ranges:
+        ledger.balance_at(s)
+        ledger.totals(s, e)
+    aggregate_time = (time.perf_counter() - t) / QUERIES
+    lo, hi = to_micros(scans[0][0]), to_micros(scans[0][1])
+    t = time.perf_counter()
+    sum(a for ts, a, k in zip(ledger.timestamps, ledger.amounts, ledger.kinds) if lo <= ts < hi and k == code)
+    print(f"balance_at + totals over the same windows:")
+    print(f"  prefix sums                {aggregate_time * 1e6:>12,.0f} us")
+    print(f"  linear scan (one type)     {(time.perf_counter() - t) * 1e3:>12,.1f} ms")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
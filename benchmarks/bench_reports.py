@@ -0,0 +1,72 @@
+# Bank-wide report time versus worker processes on synthetic accounts, checking every run
+# returns the single-process result, plus the cost of a cached repeat.
+# Usage: python -m benchmarks.bench_reports [accounts] [rows per account]
+#        (default: 1000000 accounts, 8 rows each; processes 1, 2, 4, ... up to the core count)
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from banking import ACCOUNT_TYPES, Bank, BankAccount, Ledger
+from reports import ReportEngine
+
+KINDS = ['Deposit', 'Withdrawal', 'Transfer Received', 'Transfer Sent']
+
+def synthetic_bank(n, rows, seed=1):
+    # Ledgers are filled directly with postings spread over a year of days
+    rng = random.Random(seed)
+    bank = Bank()
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        opening = rng.randint(0, 10_000_00)
+        ledger = Ledger(opening=opening)
+        balance = opening
+        for _ in range(rows):
+            kind = rng.choice(KINDS)
+            cents = rng.randint(1, 500_00)
+            if kind in ('Withdrawal', 'Transfer Sent'):
+                cents = min(cents, balance)
+                if not cents:
+                    continue
+                balance -= cents
+            else:
+                balance += cents
+            ledger.extend([kind], [cents], start + timedelta(days=rng.randrange(366)))
+        account = BankAccount(f"holder-{i}", opening / 100, rng.choice(ACCOUNT_TYPES), ledger=ledger,
+                              opening_balance=opening / 100)
+        account._cents = balance
+        account.overdraft_attempts = rng.randrange(3)
+        bank._register(account)
+    return bank
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    rows = int(argv[1]) if len(argv) > 1 else 8
+    start = time.perf_counter()
+    bank = synthetic_bank(n, rows)
+    print(f"{n:,} accounts x {rows} rows built in {time.perf_counter() - start:.1f} s; {os.cpu_count()} cores")
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    if counts[-1] != os.cpu_count():
+        counts.append(os.cpu_count() or 1)
+    baseline = expected = None
+    print(f"{'processes':>9} {'seconds':>8} {'speedup':>8}")
+    for processes in counts:
+        engine = ReportEngine(bank, processes)
+        start = time.perf_counter()
+        report = engine.report()
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            baseline, expected = elapsed, report
+        assert report == expected
+        print(f"{processes:>9} {elapsed:>8.2f} {baseline / elapsed:>8.2f}")
+    start = time.perf_counter()
+    engine.report()
+    print(f"cached repeat: {(time.perf_counter() - start) * 1e3:.0f} ms (high-water mark check)")
+    top = report.top_balances[0]
+    print(f"top balance {top[0]} ({top[2]}), overdraft attempts {report.overdraft_attempts}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
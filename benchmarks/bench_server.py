@@ -0,0 +1,108 @@
+# Load generator for the JSON-lines server: mixed deposit/withdraw/transfer traffic from
+# pipelining clients, reporting p50/p99 latency and ops/sec. Starts an in-memory server in a
+# background thread unless an address is given.
+# Usage: python -m benchmarks.bench_server [accounts] [clients] [requests] [depth] [address]
+#        (default: 1000 accounts, 16 clients, 200000 requests, 32 in flight per client)
+import asyncio
+import json
+import random
+import sys
+import time
+
+from banking import Bank, Money
+from server import ServerThread
+
+MIX = [("deposit", 0.4), ("withdraw", 0.4), ("transfer", 0.2)]
+
+async def connect(address):
+    if address.startswith("unix:"):
+        return await asyncio.open_unix_connection(address[5:])
+    host, _, port = address.rpartition(":")
+    return await asyncio.open_connection(host, int(port))
+
+async def open_accounts(address, n, prefix):
+    reader, writer = await connect(address)
+    for i in range(n):
+        request = {"id": i, "op": "open", "holder": f"{prefix}-{i}", "balance": "1000.00"}
+        writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+    ids = [json.loads(await reader.readline())["account_id"] for _ in range(n)]
+    writer.close()
+    return ids
+
+async def client(address, ids, requests, depth, seed, latencies, outcomes):
+    rng = random.Random(seed)
+    ops = rng.choices([op for op, _ in MIX], [w for _, w in MIX], k=requests)
+    reader, writer = await connect(address)
+    window = asyncio.Semaphore(depth)
+    sent = {}
+
+    async def receive():
+        for _ in range(requests):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            outcomes[response["ok"]] += 1
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for i, op in enumerate(ops):
+        await window.acquire()
+        request = {"id": i, "op": op, "account": rng.choice(ids), "amount": f"{rng.randint(1, 20000) / 100:.2f}"}
+        if op == "transfer":
+            request["to"] = rng.choice(ids)
+        sent[i] = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode())
+        if window.locked():
+            await writer.drain()
+    await receiver
+    writer.close()
+
+async def run(address, accounts, clients, requests, depth):
+    ids = await open_accounts(address, accounts, f"load-{time.time_ns()}")
+    latencies = []
+    outcomes = {True: 0, False: 0}
+    per_client = requests // clients
+    start = time.perf_counter()
+    await asyncio.gather(*(client(address, ids, per_client, depth, seed, latencies, outcomes)
+                           for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{len(latencies):,} requests from {clients} clients ({depth} in flight each) over {accounts:,} accounts")
+    print(f"ops/sec: {len(latencies) / elapsed:,.0f}")
+    print(f"latency p50: {latencies[len(latencies) // 2] * 1e3:.2f} ms  "
+          f"p99: {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms")
+    print(f"accepted: {outcomes[True]:,}  rejected: {outcomes[False]:,}")
+
+def consistent(bank):
+    # Every balance matches its ledger, and transfers neither create nor destroy money
+    sent = received = Money(0)
+    for account in bank:
+        t = account.totals()
+        if account.balance != (account.opening_balance + t['Deposit'] - t['Withdrawal']
+                               - t['Transfer Sent'] + t['Transfer Received']):
+            return False
+        sent += t['Transfer Sent']
+        received += t['Transfer Received']
+    return sent == received
+
+def main(argv):
+    accounts = int(argv[0]) if len(argv) > 0 else 1000
+    clients = int(argv[1]) if len(argv) > 1 else 16
+    requests = int(argv[2]) if len(argv) > 2 else 200_000
+    depth = int(argv[3]) if len(argv) > 3 else 32
+    server = None
+    if len(argv) > 4:
+        address = argv[4]
+    else:
+        bank = Bank()
+        server = ServerThread(bank, "127.0.0.1:0").start()
+        address = f"127.0.0.1:{server.sockname[1]}"
+    try:
+        asyncio.run(run(address, accounts, clients, requests, depth))
+    finally:
+        if server is not None:
+            server.stop()
+            print(f"ledgers consistent: {consistent(bank)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+# Startup cost: `python -X importtime` totals for the Tk-free core and the modules built on it,
+# and, when a display is available, time from process start to the login screen (other pages
+# are built on first use) and to every page built, as the dashboard used to start up.
+# Bytecode caching is switched on for the child processes, as for an installed app.
+# Usage: python -m benchmarks.bench_startup [runs]   (default: 10)
+import os
+import subprocess
+import sys
+import tempfile
+
+MODULES = ['banking', 'reports', 'server', 'Code1']
+
+STARTUP = """
+import time
+start = time.perf_counter()
+import tkinter
+import Code1
+imported = time.perf_counter()
+try:
+    app = Code1.BankApp()
+except tkinter.TclError:
+    raise SystemExit
+app.update()
+login = time.perf_counter()
+for page_name in Code1.PAGES:
+    app.get_frame(page_name)
+app.update()
+print(imported - start, login - start, time.perf_counter() - start)
+app.destroy()
+"""
+
+def child_env(data_dir):
+    env = dict(os.environ, BANK_DATA_DIR=data_dir)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+def python(args, env):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env,
+                          cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True)
+
+def import_time(module, env):
+    # Cumulative microseconds for `import module` in a fresh interpreter
+    for line in python(["-X", "importtime", "-c", f"import {module}"], env).stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f"No importtime line for {module}")
+
+def main(argv):
+    runs = int(argv[0]) if argv else 10
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = child_env(data_dir)
+        for module in MODULES:
+            import_time(module, env)  # warm the bytecode cache
+        print(f"{'module':<10} {'import ms':>10} {'loads tkinter':>14}")
+        for module in MODULES:
+            best = min(import_time(module, env) for _ in range(runs))
+            tk = python(["-c", f"import sys, {module}; print('tkinter' in sys.modules)"], env).stdout.strip()
+            print(f"{module:<10} {best / 1e3:>10.1f} {tk:>14}")
+        samples = [python(["-c", STARTUP], env).stdout.split() for _ in range(runs)]
+        if not samples[0]:
+            print("startup: skipped (no display)")
+            return
+        imported, login, everything = (min(float(s[k]) for s in samples) for k in range(3))
+        print(f"import Code1 {imported * 1e3:.1f} ms, login screen {login * 1e3:.1f} ms, "
+              f"all pages built {everything * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+# Statement export/import throughput in rows/sec for CSV, gzip'ed CSV and the columnar format
+# (plain and zlib'ed), plus the peak memory traced while exporting, which stays at a few
+# chunks whatever the history size.
+# Usage: python -m benchmarks.bench_statement [rows]   (default: 1000000)
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from banking import Bank
+
+FORMATS = [("csv", "statement.csv", False), ("csv.gz", "statement.csv.gz", False),
+           ("columnar", "statement.bst", False), ("columnar+zlib", "statement.bst", True)]
+
+def build(bank, n):
+    account = bank.open_account("source", 100.0)
+    for lo in range(0, n, 100_000):
+        account.apply_batch([('withdraw' if i % 3 == 0 else 'deposit', (1 + i % 5000) / 100)
+                             for i in range(lo, min(n, lo + 100_000))])
+    return account
+
+def peak_export(account, path, compress):
+    tracemalloc.start()
+    account.export_statement(path, compress=compress)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    bank = Bank()
+    account = build(bank, n)
+    print(f"{n:,} rows")
+    print(f"{'format':>14} {'export rows/s':>14} {'import rows/s':>14} {'MB':>7} {'export peak MB':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, filename, compress in FORMATS:
+            path = os.path.join(tmp, filename)
+            start = time.perf_counter()
+            written = account.export_statement(path, compress=compress)
+            export = time.perf_counter() - start
+            size = os.path.getsize(path)
+            target = bank.open_account(f"import-{name}", 100.0)
+            start = time.perf_counter()
+            imported = target.import_statement(path)
+            load = time.perf_counter() - start
+            assert written == imported == n and target.balance == account.balance
+            peak = peak_export(account, path, compress)
+            print(f"{name:>14} {n / export:>14,.0f} {n / load:>14,.0f} {size / 1e6:>7.1f} {peak / 1e6:>15.1f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
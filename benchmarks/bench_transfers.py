@@ -0,0 +1,50 @@
+# Concurrent random transfers across a Bank: throughput and conservation of money.
+# Usage: python -m benchmarks.bench_transfers [accounts] [transfers] [threads]
+#        (default: 100000 accounts, 1000000 transfers, 8 threads)
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from banking import Bank
+
+OPENING_BALANCE = 1000.0
+
+def populate(bank, n):
+    return [bank.open_account(f"holder-{i}", OPENING_BALANCE).account_id for i in range(n)]
+
+def worker(bank, ids, transfers, seed):
+    rng = random.Random(seed)
+    done = rejected = 0
+    for _ in range(transfers):
+        source, target = rng.sample(ids, 2)
+        try:
+            bank.transfer(source, target, float(rng.randint(1, 500)))
+            done += 1
+        except ValueError:
+            rejected += 1
+    return done, rejected
+
+def main(argv):
+    accounts = int(argv[0]) if len(argv) > 0 else 100_000
+    transfers = int(argv[1]) if len(argv) > 1 else 1_000_000
+    threads = int(argv[2]) if len(argv) > 2 else 8
+    bank = Bank()
+    ids = populate(bank, accounts)
+    expected = bank.total_balance()
+    per_thread = transfers // threads
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda seed: worker(bank, ids, per_thread, seed), range(threads)))
+    elapsed = time.perf_counter() - start
+    done = sum(r[0] for r in results)
+    rejected = sum(r[1] for r in results)
+    total = bank.total_balance()
+    print(f"{accounts:,} accounts, {threads} threads: {done:,} transfers, {rejected:,} rejected "
+          f"in {elapsed:.2f}s = {(done + rejected) / elapsed:,.0f} ops/s")
+    print(f"money conserved: {total == expected} ({total:,.2f} vs {expected:,.2f})")
+    if total != expected:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,103 @@
+# Event-loop stall while a burst of Dashboard postings is queued: the old handlers (post and
+# repaint on the Tk thread) against BackgroundTasks (post and prepare on the worker, one
+# coalesced repaint per frame). A heartbeat timer every HEARTBEAT_MS records how late it
+# fires; the worst lateness is the longest the window would have been frozen.
+# Usage: python -m benchmarks.bench_ui_stall [operations] [memory]
+#        (default: 10000 operations on a journal-backed account in a temp directory)
+import sys
+import tempfile
+import time
+
+from Code1 import BackgroundTasks, Dashboard, PassbookRenderer, TransactionHistoryView
+from banking import Bank
+from benchmarks.tk_stubs import StubCanvas, StubRoot, StubScrollbar, StubTreeview
+
+HEARTBEAT_MS = 5
+
+class Views:
+    # What a Dashboard repaint touches: the info labels, the history table and the passbook
+    def __init__(self):
+        self.history = TransactionHistoryView(StubTreeview(), StubScrollbar())
+        self.passbook = PassbookRenderer(StubCanvas())
+        self.info = None
+        self.repaints = 0
+
+    def repaint(self, account, info=None, rows=None):
+        self.info = info or account.info()
+        self.history.refresh(account.all_transactions())
+        self.passbook.show(account.all_transactions(), rows)
+        self.repaints += 1
+
+def heartbeat(root, lateness, state):
+    expected = time.perf_counter() + HEARTBEAT_MS / 1000
+
+    def beat():
+        nonlocal expected
+        now = time.perf_counter()
+        lateness.append(max(0.0, now - expected))
+        expected = now + HEARTBEAT_MS / 1000
+        if not state["done"]:
+            root.after(HEARTBEAT_MS, beat)
+
+    root.after(HEARTBEAT_MS, beat)
+
+def run_sync(account, views, operations):
+    root = StubRoot()
+    state = {"done": False, "left": operations}
+
+    def handler():
+        # The old do_deposit: post, then setup() and PassbookPage.setup() on the Tk thread.
+        # Each queued click is its own event, so due timers get a turn in between.
+        account.deposit(1.25)
+        views.repaint(account)
+        state["left"] -= 1
+        state["done"] = not state["left"]
+        if not state["done"]:
+            root.after(0, handler)
+
+    root.after(0, handler)
+    return root, state
+
+def run_background(account, views, operations):
+    root = StubRoot()
+    tasks = BackgroundTasks(root)
+    state = {"done": False, "left": operations, "tasks": tasks}
+
+    def posted(view):
+        _, info, rows = view
+        tasks.request_repaint("views", lambda: views.repaint(account, info, rows))
+        state["left"] -= 1
+        state["done"] = not state["left"] and not tasks.pending
+
+    for _ in range(operations):
+        tasks.submit(Dashboard._run_and_prepare, tasks, account, account.deposit, 1.25, on_done=posted)
+    return root, state
+
+def measure(setup, account, operations):
+    views = Views()
+    start = time.perf_counter()
+    root, state = setup(account, views, operations)
+    lateness = []
+    heartbeat(root, lateness, state)
+    root.run(lambda: state["done"])
+    elapsed = time.perf_counter() - start
+    if "tasks" in state:
+        state["tasks"].close()
+    lateness = sorted(lateness) or [0.0]
+    return elapsed, lateness[-1], lateness[int(len(lateness) * 0.99)], views.repaints
+
+def main(argv):
+    operations = int(argv[0]) if argv else 10_000
+    in_memory = len(argv) > 1 and argv[1] == "memory"
+    with tempfile.TemporaryDirectory() as data_dir:
+        bank = Bank(None if in_memory else data_dir)
+        print(f"{operations:,} deposits, {'in memory' if in_memory else 'journal-backed'}")
+        print(f"{'mode':>11} {'total s':>8} {'max stall ms':>13} {'p99 stall ms':>13} {'repaints':>9}")
+        for name, setup in (("tk thread", run_sync), ("background", run_background)):
+            account = bank.open_account(name, 100.0)
+            elapsed, worst, p99, repaints = measure(setup, account, operations)
+            print(f"{name:>11} {elapsed:>8.2f} {worst * 1e3:>13.1f} {p99 * 1e3:>13.1f} {repaints:>9,}")
+        bank.close()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
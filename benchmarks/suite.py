@@ -0,0 +1,242 @@
+# Reproducible benchmark suite over seeded synthetic workloads (benchmarks/workloads.py):
+# posting throughput, history query latency, the per-posting cost of refresh_transactions and
+# draw_passbook, and memory per transaction. Each case runs `--repeat` times and keeps the best
+# value of each metric, as timeit does: slower runs measure other load on the machine. Results
+# are saved as JSON; --compare checks them against a stored baseline and exits 1 when any
+# metric regressed by more than --threshold (a fraction, default 0.10).
+# View cases use real Tk widgets when a display is available, otherwise the counting stubs;
+# only compare results taken the same way (recorded as "widgets" in the JSON).
+# Usage: python -m benchmarks.suite [--quick] [--save FILE] [--compare BASELINE] [--threshold 0.1]
+#        python -m benchmarks.suite --results FILE --compare BASELINE   (compare without running)
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from Code1 import PassbookRenderer, TransactionHistoryView
+from banking import BankAccount
+from benchmarks import workloads
+from benchmarks.bench_history_view import make_widgets
+from benchmarks.bench_passbook import make_canvas
+from benchmarks.tk_stubs import real_tk_root
+
+CASES = {}  # name -> function(size, seed, root) returning {metric: (value, unit, better)}
+
+SIZES = {
+    # full, quick
+    'accounts': (1_000, 200),
+    'postings': (100_000, 10_000),
+    'history': (1_000_000, 100_000),
+    'queries': (500, 100),
+    'actions': (500, 100),
+    'memory_rows': (200_000, 20_000),
+}
+
+def case(name):
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def _posting(size, seed, skew):
+    people = workloads.population(size('accounts'), seed)
+    _, accounts = workloads.open_accounts(people)
+    ops = workloads.operations(len(accounts), size('postings'), seed, skew=skew)
+    start = time.perf_counter()
+    refused = workloads.apply(accounts, ops)
+    elapsed = time.perf_counter() - start
+    return {'ops_per_s': (len(ops) / elapsed, 'ops/s', 'higher'),
+            'refused': (refused / len(ops), 'fraction', 'info')}
+
+@case('posting.hot')
+def posting_hot(size, seed, root):
+    return _posting(size, seed, workloads.HOT_SKEW)
+
+@case('posting.uniform')
+def posting_uniform(size, seed, root):
+    return _posting(size, seed, 0)
+
+@case('history.query')
+def history_query(size, seed, root):
+    # Date range + type queries (a 1/30 slice of the history) and newest-first pages of 50
+    start, span = datetime(2024, 1, 1), timedelta(days=365)
+    account = BankAccount("history")
+    account.transactions = workloads.ledger(size('history'), seed, start, span)
+    rng = random.Random(seed)
+    ranges, pages = [], []
+    for _ in range(size('queries')):
+        lo = start + (span - span / 30) * rng.random()
+        kind = rng.choice(['Deposit', 'Withdrawal'])
+        t = time.perf_counter()
+        for _ in account.query(lo, lo + span / 30, kind):
+            pass
+        ranges.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        account.page(50, newest_first=True)
+        pages.append(time.perf_counter() - t)
+    return {'range_p50_us': (_percentile(ranges, 50) * 1e6, 'us', 'lower'),
+            'range_p99_us': (_percentile(ranges, 99) * 1e6, 'us', 'lower'),
+            'page_p50_us': (_percentile(pages, 50) * 1e6, 'us', 'lower'),
+            'page_p99_us': (_percentile(pages, 99) * 1e6, 'us', 'lower')}
+
+def _per_posting(refresh, ledger, actions):
+    # Post one deposit, then refresh the view, `actions` times; returns per-posting latencies.
+    # The collector is off while timing, as in timeit: a stray collection is most of a tail
+    # sample this small.
+    now = datetime.now()
+    samples = []
+    gc.disable()
+    try:
+        for _ in range(actions):
+            ledger.append('Deposit', 2500, now)
+            t = time.perf_counter()
+            refresh()
+            samples.append(time.perf_counter() - t)
+    finally:
+        gc.enable()
+    return samples
+
+@case('ui.refresh_transactions')
+def refresh_transactions(size, seed, root):
+    # What Dashboard.refresh_transactions does after each posting, with a long history
+    ledger = workloads.ledger(size('history'), seed)
+    tree, scrollbar = make_widgets(root)
+    view = TransactionHistoryView(tree, scrollbar)
+    view.refresh(ledger)
+    samples = _per_posting(lambda: view.refresh(ledger), ledger, size('actions'))
+    return {'p50_us': (_percentile(samples, 50) * 1e6, 'us', 'lower'),
+            'p90_us': (_percentile(samples, 90) * 1e6, 'us', 'lower')}
+
+@case('ui.draw_passbook')
+def draw_passbook(size, seed, root):
+    # What PassbookPage.draw_passbook does after each posting, with a long history
+    ledger = workloads.ledger(size('history'), seed)
+    renderer = PassbookRenderer(make_canvas(root))
+    renderer.show(ledger)
+    samples = _per_posting(lambda: renderer.show(ledger), ledger, size('actions'))
+    return {'p50_us': (_percentile(samples, 50) * 1e6, 'us', 'lower'),
+            'p90_us': (_percentile(samples, 90) * 1e6, 'us', 'lower'),
+            'tk_calls': (renderer.last_refresh_calls, 'calls', 'lower')}
+
+@case('memory.per_transaction')
+def memory_per_transaction(size, seed, root):
+    # Bytes retained per posting on an in-memory account (ledger columns and indexes)
+    rng = random.Random(seed)
+    amounts = [rng.randint(1, 50_000) / 100 for _ in range(size('memory_rows'))]
+    account = BankAccount("memory", 1_000_000_000)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i, amount in enumerate(amounts):
+        if i % 3:
+            account.deposit(amount)
+        else:
+            account.withdraw(amount)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'bytes': ((after - before) / len(amounts), 'B', 'lower')}
+
+def _best(values, better):
+    values = list(values)
+    if better == 'higher':
+        return max(values)
+    if better == 'lower':
+        return min(values)
+    return statistics.median(values)
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(names, quick, seed, repeat):
+    root = real_tk_root()
+    column = 1 if quick else 0
+    size = lambda key: SIZES[key][column]
+    results = {}
+    for name in names:
+        runs = []
+        for _ in range(repeat):
+            gc.collect()
+            runs.append(CASES[name](size, seed, root))
+        results[name] = {metric: {'value': _best((r[metric][0] for r in runs), better),
+                                  'unit': unit, 'better': better}
+                         for metric, (_, unit, better) in runs[0].items()}
+        print(f"{name:<26} " + "  ".join(f"{metric}={m['value']:,.4g} {m['unit']}"
+                                         for metric, m in results[name].items()), flush=True)
+    if root is not None:
+        root.destroy()
+    return {'meta': {'created': datetime.now().isoformat(timespec='seconds'), 'revision': _git_revision(),
+                     'python': platform.python_version(), 'platform': platform.platform(),
+                     'cpus': os.cpu_count(), 'widgets': 'tk' if root is not None else 'stubs',
+                     'quick': quick, 'seed': seed, 'repeat': repeat},
+            'results': results}
+
+def compare(current, baseline, threshold):
+    # Returns the regressed (case, metric) pairs after printing the comparison table
+    for key in ('widgets', 'quick', 'seed'):
+        if current['meta'].get(key) != baseline['meta'].get(key):
+            print(f"warning: {key} differs from the baseline "
+                  f"({current['meta'].get(key)} vs {baseline['meta'].get(key)})")
+    regressions = []
+    print(f"{'case':<26} {'metric':<14} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metrics in baseline['results'].items():
+        for metric, old in metrics.items():
+            new = current['results'].get(name, {}).get(metric)
+            if new is None or old['better'] not in ('higher', 'lower'):
+                continue
+            change = (new['value'] - old['value']) / old['value'] if old['value'] else 0.0
+            worse = change if old['better'] == 'lower' else -change
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions.append((name, metric))
+            elif worse < -threshold:
+                flag = "  improved"
+            print(f"{name:<26} {metric:<14} {old['value']:>12,.4g} {new['value']:>12,.4g} {change:>+8.1%}{flag}")
+    return regressions
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, e.g. for CI")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best is reported")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=list(CASES), metavar="CASE")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--results", help="compare this results file instead of running the suite")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction")
+    args = parser.parse_args(argv)
+    if args.results:
+        with open(args.results, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = run(args.only, args.quick, args.seed, args.repeat)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,115 @@
+# Minimal stand-ins for the Tk widgets the views drive, for running view benchmarks headless.
+# Each stub counts the widget calls it receives in `calls`.
+import heapq
+import itertools
+import time
+
+def real_tk_root():
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+class StubTreeview:
+    def __init__(self):
+        self.calls = 0
+        self._items = []
+        self._values = {}
+        self._ids = itertools.count()
+
+    def get_children(self, item=""):
+        self.calls += 1
+        return tuple(self._items)
+
+    def insert(self, parent, index, values=()):
+        self.calls += 1
+        iid = f"I{next(self._ids)}"
+        self._values[iid] = values
+        if index == "end":
+            self._items.append(iid)
+        else:
+            self._items.insert(index, iid)
+        return iid
+
+    def item(self, iid, values=None):
+        self.calls += 1
+        if values is not None:
+            self._values[iid] = values
+        return {"values": self._values[iid]}
+
+    def delete(self, *items):
+        self.calls += 1
+        for iid in items:
+            self._items.remove(iid)
+            del self._values[iid]
+
+class StubScrollbar:
+    def __init__(self):
+        self.calls = 0
+
+    def set(self, first, last):
+        self.calls += 1
+
+class StubCanvas:
+    def __init__(self, width=950, height=600):
+        self.calls = 0
+        self._config = {"width": width, "height": height}
+        self._items = {}
+        self._ids = itertools.count(1)
+
+    def __getitem__(self, key):
+        return self._config[key]
+
+    def _create(self, kind, *args, **kwargs):
+        self.calls += 1
+        iid = next(self._ids)
+        self._items[iid] = kwargs
+        return iid
+
+    def create_polygon(self, *args, **kwargs):
+        return self._create("polygon", *args, **kwargs)
+
+    def create_line(self, *args, **kwargs):
+        return self._create("line", *args, **kwargs)
+
+    def create_text(self, *args, **kwargs):
+        return self._create("text", *args, **kwargs)
+
+    def itemconfigure(self, iid, **kwargs):
+        self.calls += 1
+        self._items[iid].update(kwargs)
+
+    def coords(self, iid, *args):
+        self.calls += 1
+
+    def move(self, tag, dx, dy):
+        self.calls += 1
+
+    def tag_bind(self, iid, sequence, func):
+        self.calls += 1
+
+    def delete(self, *items):
+        self.calls += 1
+        if "all" in items:
+            self._items.clear()
+
+class StubRoot:
+    # Single-threaded after() loop standing in for Tk's mainloop
+    def __init__(self):
+        self._timers = []
+        self._seq = itertools.count()
+
+    def after(self, ms, func, *args):
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, next(self._seq), func, args))
+
+    def run(self, until):
+        while self._timers and not until():
+            due = self._timers[0][0]
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            _, _, func, args = heapq.heappop(self._timers)
+            func(*args)
@@ -0,0 +1,70 @@
+# Seeded synthetic workloads for the benchmark suite: account populations, deposit/withdraw/
+# transfer mixes with skewed hot accounts, and pre-filled ledgers. The same seed always
+# produces the same workload, so runs on different commits post exactly the same operations.
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from banking import ACCOUNT_TYPES, TXN_TYPES, Bank, Ledger, Money
+
+DEFAULT_MIX = {'deposit': 0.45, 'withdraw': 0.35, 'transfer': 0.20}
+HOT_SKEW = 1.1  # Zipf exponent: the hottest 1% of 1,000 accounts get about half the postings
+
+def population(n, seed=0):
+    # [(holder, opening balance, account type)]
+    rng = random.Random(seed)
+    return [(f"holder-{i:07d}", Money(rng.randint(0, 500_000)), rng.choice(ACCOUNT_TYPES)) for i in range(n)]
+
+def open_accounts(people, data_dir=None):
+    bank = Bank(data_dir)
+    return bank, [bank.open_account(holder, balance, kind) for holder, balance, kind in people]
+
+def hot_indices(n, count, skew, rng):
+    # Account k is drawn with weight 1 / (k + 1) ** skew; skew 0 is uniform
+    if not skew:
+        return [rng.randrange(n) for _ in range(count)]
+    weights = list(itertools.accumulate(1 / (k + 1) ** skew for k in range(n)))
+    return rng.choices(range(n), cum_weights=weights, k=count)
+
+def operations(n_accounts, count, seed=0, mix=None, skew=HOT_SKEW):
+    # [(op, account index, amount, target index or None)]; transfer targets are uniform
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    ops = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    result = []
+    for op, source in zip(ops, hot_indices(n_accounts, count, skew, rng)):
+        amount = Money(rng.randint(1, 50_000))
+        target = None
+        if op == 'transfer':
+            target = rng.randrange(n_accounts - 1)
+            target += target >= source
+        result.append((op, source, amount, target))
+    return result
+
+def apply(accounts, ops):
+    # Posts the operations in order; returns how many were refused for insufficient funds
+    refused = 0
+    for op, source, amount, target in ops:
+        account = accounts[source]
+        try:
+            if op == 'deposit':
+                account.deposit(amount)
+            elif op == 'withdraw':
+                account.withdraw(amount)
+            else:
+                account.transfer(amount, accounts[target])
+        except ValueError:
+            refused += 1
+    return refused
+
+def ledger(rows, seed=0, start=datetime(2024, 1, 1), span=timedelta(days=365), batch=1000):
+    # A ledger of `rows` postings spread evenly over `span`, `batch` rows per timestamp
+    rng = random.Random(seed)
+    result = Ledger(opening=10_000_000_00)
+    steps = max(1, -(-rows // batch))
+    for step in range(steps):
+        n = min(batch, rows - step * batch)
+        kinds = rng.choices(TXN_TYPES, weights=(4, 3, 2, 2), k=n)
+        amounts = [rng.randint(1, 50_000) for _ in range(n)]
+        result.extend(kinds, amounts, start + span * step / steps)
+    return result
@@ -0,0 +1,160 @@
+# Display strings for ledger rows, shared by the history table and the passbook through one
+# bounded LRU cache keyed by (ledger uid, row index, layout). Ledger rows never change once
+# written, so an entry stays valid as long as its ledger; invalidate() drops a ledger's rows
+# (or everything, e.g. at logout) and a ledger rebuilt from its journal gets a new uid.
+# Rows missing from a lookup are formatted together straight from the stored columns: each
+# distinct day is formatted once and times of day by arithmetic, instead of a datetime and an
+# strftime per row.
+import threading
+from collections import OrderedDict
+
+from banking import TXN_STATUSES, TXN_TYPES
+import metrics
+from units import DAY_MICROS, format_cents, from_micros
+
+CACHE_ROWS = 8192
+
+HISTORY = "history"    # (type, amount, "YYYY-MM-DD HH:MM:SS", status)
+PASSBOOK = "passbook"  # ("YYYY-MM-DD HH:MM", type, amount, balance after, status)
+
+SMALL_BATCH = 32  # below this many rows, formatting row by row beats slicing out columns
+
+_dates = {}  # day number -> "YYYY-MM-DD "
+
+def _date(day):
+    date = _dates.get(day)
+    if date is None:
+        if len(_dates) >= CACHE_ROWS:
+            _dates.clear()
+        date = _dates[day] = from_micros(day * DAY_MICROS).strftime("%Y-%m-%d ")
+    return date
+
+def format_time(us, seconds=True):
+    # "YYYY-MM-DD HH:MM[:SS]" for epoch microseconds, same as strftime on from_micros(us)
+    day, rest = divmod(us, DAY_MICROS)
+    s = rest // 1_000_000
+    if seconds:
+        return "%s%02d:%02d:%02d" % (_date(day), s // 3600, s // 60 % 60, s % 60)
+    return "%s%02d:%02d" % (_date(day), s // 3600, s // 60 % 60)
+
+def format_times(micros, seconds=True):
+    out = []
+    last = text = None
+    for us in micros:
+        # rows posted together, e.g. by apply_batch, share their timestamp
+        if us != last:
+            last = us
+            text = format_time(us, seconds)
+        out.append(text)
+    return out
+
+def format_amount(cents):
+    return "$" + format_cents(cents, ",.2f")
+
+def format_amounts(cents):
+    return list(map(format_amount, cents))
+
+@metrics.timed("format.history_rows")
+def history_rows(ledger, indices):
+    if len(indices) < SMALL_BATCH:
+        rows = []
+        for i in indices:
+            micros, cents, _, kind, status = ledger.record(i)
+            rows.append((TXN_TYPES[kind], format_amount(cents), format_time(micros), TXN_STATUSES[status]))
+        return rows
+    micros, cents, _, kinds, statuses = ledger.columns(indices)
+    return list(zip(map(TXN_TYPES.__getitem__, kinds), format_amounts(cents), format_times(micros),
+                    map(TXN_STATUSES.__getitem__, statuses)))
+
+@metrics.timed("format.passbook_rows")
+def passbook_rows(ledger, indices):
+    if len(indices) < SMALL_BATCH:
+        rows = []
+        for i in indices:
+            micros, cents, balance, kind, status = ledger.record(i)
+            rows.append((format_time(micros, False), TXN_TYPES[kind], format_amount(cents),
+                         format_amount(balance), TXN_STATUSES[status]))
+        return rows
+    micros, cents, balances, kinds, statuses = ledger.columns(indices)
+    return list(zip(format_times(micros, seconds=False), map(TXN_TYPES.__getitem__, kinds),
+                    format_amounts(cents), format_amounts(balances), map(TXN_STATUSES.__getitem__, statuses)))
+
+LAYOUTS = {HISTORY: history_rows, PASSBOOK: passbook_rows}
+
+class RowCache:
+    # Used from the Tk thread and the task worker: lookups and inserts take the lock, the
+    # formatting of misses runs outside it
+    def __init__(self, capacity=CACHE_ROWS):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rows(self, ledger, indices, layout):
+        # Formatted rows for `indices` of ledger, in that order
+        uid = ledger.uid
+        out = []
+        missing = []
+        cached = self._rows
+        with self._lock:
+            for i in indices:
+                key = (uid, i, layout)
+                texts = cached.get(key)
+                if texts is None:
+                    missing.append(len(out))
+                else:
+                    cached.move_to_end(key)
+                out.append(texts)
+            self.hits += len(out) - len(missing)
+            self.misses += len(missing)
+        if metrics.ENABLED:
+            metrics.count("format.cache_hits", len(out) - len(missing))
+            metrics.count("format.cache_misses", len(missing))
+        if missing:
+            # a range missed as a whole is passed on as is, so the ledger can slice its columns
+            wanted = indices if len(missing) == len(out) else [indices[k] for k in missing]
+            formatted = LAYOUTS[layout](ledger, wanted)
+            with self._lock:
+                for k, texts in zip(missing, formatted):
+                    out[k] = cached[(uid, indices[k], layout)] = texts
+                self._evict()
+        return out
+
+    def row(self, ledger, i, layout):
+        return self.rows(ledger, [i], layout)[0]
+
+    def put(self, ledger, rows, layout):
+        # rows: {row index: formatted texts}, e.g. formatted ahead of time on another thread
+        uid = ledger.uid
+        with self._lock:
+            for i, texts in rows.items():
+                self._rows[(uid, i, layout)] = texts
+                self._rows.move_to_end((uid, i, layout))
+            self._evict()
+
+    def _evict(self):
+        overflow = len(self._rows) - self.capacity
+        if overflow > 0:
+            for _ in range(overflow):
+                self._rows.popitem(last=False)
+            self.evictions += overflow
+
+    def invalidate(self, ledger=None):
+        with self._lock:
+            if ledger is None:
+                self._rows.clear()
+            else:
+                for key in [key for key in self._rows if key[0] == ledger.uid]:
+                    del self._rows[key]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"rows": len(self._rows), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+FORMATS = RowCache()
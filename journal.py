@@ -0,0 +1,279 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Fixed-width journal record: timestamp (epoch us), amount (cents), balance after the entry
+# (cents), type code, status code, two pad bytes and a CRC32 of the first 28 bytes so torn
+# writes are detected on recovery. Records are 32 bytes with every int64 field 8-byte aligned.
+RECORD = struct.Struct("<qqqBB2xI")
+RECORD_SIZE = RECORD.size
+_BODY = struct.Struct("<qqqBB2x")
+
+DEFAULT_SNAPSHOT_EVERY = 10_000
+MAX_PENDING_BYTES = 1 << 20
+_LOCK_OFFSET = 1 << 62  # msvcrt locks a byte range; one far past the records keeps them readable
+
+def pack_record(micros, cents, balance, kind, status):
+    body = _BODY.pack(micros, cents, balance, kind, status)
+    return body + struct.pack("<I", zlib.crc32(body))
+
+def unpack_record(buf, offset=0):
+    micros, cents, balance, kind, status, crc = RECORD.unpack_from(buf, offset)
+    if zlib.crc32(buf[offset:offset + _BODY.size]) != crc:
+        raise ValueError(f"Corrupt journal record at byte {offset}")
+    return micros, cents, balance, kind, status
+
+def _open_exclusive(path):
+    # Append handle on a journal holding an exclusive lock until it is closed, so a journal has
+    # one writer at a time, whether the other is in another process or in this one
+    f = open(path, "ab", buffering=0)
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(_LOCK_OFFSET)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        raise BlockingIOError(f"Journal {path} is already open for writing elsewhere") from None
+    return f
+
+class Journal:
+    # Append-only binary transaction journal with group commit and periodic balance snapshots.
+    # Records are buffered and fsync'ed together: immediately when commit_window is 0, otherwise
+    # at most commit_window seconds after the first unsynced record. Opening a journal locks it;
+    # a second writer gets BlockingIOError until close(). Readers (JournalView) need no lock.
+    # A failed write leaves the file as of the last commit. With commit_window 0, append and
+    # append_many then raise with their records dropped; a failed background commit keeps its
+    # records pending and is retried, and its error raised, by the next append, sync or close.
+    def __init__(self, path, snapshot, commit_window=0.0, snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.meta = {k: v for k, v in snapshot.items() if k not in ("count", "balance")}
+        self.commit_window = commit_window
+        self.snapshot_every = snapshot_every
+        self.count = snapshot["count"]
+        self.balance = snapshot["balance"]
+        self._snapshot_count = snapshot["count"]
+        self._meta_changed = False
+        self._synced_count = snapshot["count"]
+        self._pending = bytearray()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._failure = None  # error of the last commit, while its records are still pending
+        self._file = _open_exclusive(path)
+
+    @classmethod
+    def create(cls, path, meta, balance, **options):
+        if os.path.exists(path):
+            raise FileExistsError(f"Journal already exists: {path}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        snapshot = dict(meta, count=0, balance=balance)
+        open(path, "wb").close()
+        _write_snapshot(path + ".snap", snapshot)
+        return cls(path, snapshot, **options)
+
+    @classmethod
+    def open(cls, path, **options):
+        # Returns the journal plus the records written after the latest snapshot. A torn or
+        # corrupt record ends the journal: it and anything after it are truncated away.
+        with open(path + ".snap", "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        start = snapshot["count"] * RECORD_SIZE
+        journal = cls(path, snapshot, **options)  # locked before recovery may truncate the file
+        try:
+            with open(path, "r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size < start:
+                    raise ValueError(f"Journal {path} is shorter than its snapshot")
+                f.seek(start)
+                data = f.read()
+                tail = []
+                good = 0
+                while good + RECORD_SIZE <= len(data):
+                    try:
+                        tail.append(unpack_record(data, good))
+                    except ValueError:
+                        break
+                    good += RECORD_SIZE
+                if start + good != size:
+                    f.truncate(start + good)
+                    os.fsync(f.fileno())
+        except BaseException:
+            journal._file.close()
+            raise
+        journal.count += len(tail)
+        journal._synced_count = journal.count
+        if tail:
+            journal.balance = tail[-1][2]
+        return journal, tail
+
+    def append(self, micros, cents, balance, kind, status):
+        with self._lock:
+            if self._failure is not None:
+                self._sync_locked()
+            mark, count, previous = len(self._pending), self.count, self.balance
+            self._pending += pack_record(micros, cents, balance, kind, status)
+            self.count += 1
+            self.balance = balance
+            if self.commit_window <= 0 or len(self._pending) >= MAX_PENDING_BYTES:
+                try:
+                    self._sync_locked()
+                except BaseException:
+                    del self._pending[mark:]
+                    self.count, self.balance = count, previous
+                    raise
+            elif self._timer is None:
+                self._timer = threading.Timer(self.commit_window, self._commit)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def append_many(self, records):
+        # records: iterable of (micros, cents, balance, kind, status); committed as one group
+        with self._lock:
+            mark, count, previous = len(self._pending), self.count, self.balance
+            try:
+                for record in records:
+                    self._pending += pack_record(*record)
+                    self.count += 1
+                    self.balance = record[2]
+                self._sync_locked()
+            except BaseException:
+                del self._pending[mark:]
+                self.count, self.balance = count, previous
+                raise
+
+    def _commit(self):
+        # Timer thread: a failure stays in self._failure for the next caller to see
+        try:
+            self.sync()
+        except OSError:
+            pass
+
+    def update_meta(self, **values):
+        # Metadata kept alongside the balance, e.g. counters; written with the next snapshot
+        with self._lock:
+            self.meta.update(values)
+            self._meta_changed = True
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            try:
+                with memoryview(self._pending) as pending:
+                    written = 0
+                    while written < len(pending):  # a write to a nearly full disk may be partial
+                        written += self._file.write(pending[written:])
+                os.fsync(self._file.fileno())
+            except OSError as exc:
+                self._failure = exc
+                try:
+                    os.ftruncate(self._file.fileno(), self._synced_count * RECORD_SIZE)
+                except OSError:
+                    pass  # recovery drops a torn tail on the next open
+                raise
+            self._failure = None
+            self._pending.clear()
+            self._synced_count = self.count
+        if self._synced_count - self._snapshot_count >= self.snapshot_every:
+            try:
+                self._snapshot_locked()
+            except OSError:
+                pass  # the records are committed; the snapshot is retried with the next commit
+
+    def _snapshot_locked(self):
+        _write_snapshot(self.snapshot_path, dict(self.meta, count=self._synced_count, balance=self.balance))
+        self._snapshot_count = self._synced_count
+        self._meta_changed = False
+
+    def view(self):
+        # Zero-copy view of the records synced so far
+        return JournalView(self.path, self._synced_count)
+
+    def close(self):
+        with self._lock:
+            try:
+                self._sync_locked()
+                if self._snapshot_count != self._synced_count or self._meta_changed:
+                    self._snapshot_locked()
+            finally:
+                self._file.close()
+
+def read_meta(path):
+    # The metadata (holder, account type, opening balance, overdraft attempts) in a journal's
+    # snapshot, without opening the journal itself
+    with open(path + ".snap", "r", encoding="utf-8") as f:
+        return {k: v for k, v in json.load(f).items() if k not in ("count", "balance")}
+
+class JournalView:
+    # Read-only, zero-copy access to a journal file through mmap; any number of processes can
+    # map the same file. Columns are strided memoryviews straight into the mapped records, so
+    # view.balances[i] or view.micros[-15:] neither parse nor copy. CRCs are not checked here;
+    # a torn final record is left out. count caps the records mapped (default: the whole file).
+    # close() unmaps the file; the columns cannot be read after it.
+    def __init__(self, path, count=None):
+        if sys.byteorder != "little":
+            raise NotImplementedError("Journal views need a little-endian host")
+        self.path = path
+        self.meta = read_meta(path)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.count = size // RECORD_SIZE if count is None else min(count, size // RECORD_SIZE)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        if self._map is not None and hasattr(mmap, "MADV_RANDOM"):
+            # Readers mostly touch a page or two (recent rows), not a sequential scan
+            self._map.madvise(mmap.MADV_RANDOM)
+        whole = memoryview(self._map if self._map is not None else b"")
+        records = whole[:self.count * RECORD_SIZE]
+        words = records.cast("q")
+        self.micros = words[0::4]
+        self.cents = words[1::4]
+        self.balances = words[2::4]
+        self.kinds = records[24::RECORD_SIZE]
+        self.statuses = records[25::RECORD_SIZE]
+        self._views = (words, records, whole)  # released by close(), after the columns
+
+    def __len__(self):
+        return self.count
+
+    def read(self, i):
+        return self.micros[i], self.cents[i], self.balances[i], self.kinds[i], self.statuses[i]
+
+    def close(self):
+        # The map cannot be closed while any memoryview over it is alive
+        for view in (self.micros, self.cents, self.balances, self.kinds, self.statuses) + self._views:
+            view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def numpy(self):
+        # The records as a NumPy structured array over the same mapping (needs numpy)
+        import numpy
+        dtype = numpy.dtype([("micros", "<i8"), ("cents", "<i8"), ("balance", "<i8"),
+                             ("kind", "u1"), ("status", "u1"), ("pad", "V2"), ("crc", "<u4")])
+        return numpy.frombuffer(self._map if self._map is not None else b"", dtype, self.count)
+
+def _write_snapshot(path, snapshot):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
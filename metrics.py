@@ -0,0 +1,231 @@
+# Opt-in latency histograms and counters for account operations and UI refreshes.
+#   BANK_METRICS=1             record metrics (otherwise the decorators return functions
+#                              unchanged and timer()/count() are no-ops)
+#   BANK_METRICS_FILE=path     write a Prometheus text-format snapshot there at exit
+#   BANK_PROFILE=path          sample every thread's stack and write folded stacks (one
+#                              "frame;frame;frame count" line each, for flame graphs) at exit
+#   BANK_PROFILE_INTERVAL=ms   sampling interval, default 5
+# Histograms use HDR-style log-linear buckets: exact below 32 ns, then 16 buckets per power
+# of two, so any recorded latency is within 1/16 of its bucket's lower bound.
+import atexit
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from functools import wraps
+
+ENABLED = os.environ.get("BANK_METRICS", "") not in ("", "0")
+
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+_LINEAR = _SUB * 2
+
+def bucket_index(ns):
+    if ns < _LINEAR:
+        return ns
+    shift = ns.bit_length() - _SUB_BITS - 1
+    return shift * _SUB + (ns >> shift)
+
+def bucket_floor(index):
+    # Smallest value landing in bucket `index`
+    if index < _LINEAR:
+        return index
+    shift = index // _SUB - 1
+    return (index - shift * _SUB) << shift
+
+class Histogram:
+    # Updates take no lock: under heavy thread contention an occasional sample can be lost,
+    # which keeps record() cheap enough for per-row formatting paths
+    def __init__(self):
+        self.buckets = [0] * bucket_index(1 << 63)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        if ns < _LINEAR:
+            index = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - _SUB_BITS - 1
+            index = shift * _SUB + (ns >> shift)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def nonzero(self):
+        return [(index, n) for index, n in enumerate(self.buckets) if n]
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile (q in 0..100), in ns
+        rank = q / 100 * self.count
+        seen = 0
+        for index, n in self.nonzero():
+            seen += n
+            if seen >= rank:
+                return min(bucket_floor(index + 1), self.max)
+        return self.max
+
+class Registry:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def text(self):
+        lines = [f"{'operation':<32} {'count':>9} {'mean us':>9} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'max us':>9}"]
+        for name in sorted(self.histograms):
+            h = self.histograms[name]
+            if h.count:
+                lines.append(f"{name:<32} {h.count:>9} {h.total / h.count / 1e3:>9.1f} {h.percentile(50) / 1e3:>9.1f} "
+                             f"{h.percentile(90) / 1e3:>9.1f} {h.percentile(99) / 1e3:>9.1f} {h.max / 1e3:>9.1f}")
+        for name in sorted(self.counters):
+            lines.append(f"{name:<32} {self.counters[name]:>9}")
+        return "\n".join(lines) + "\n"
+
+    def prometheus(self):
+        lines = []
+        for name in sorted(self.histograms):
+            h = self.histograms[name]
+            metric = _metric_name(name) + "_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for index, n in h.nonzero():
+                cumulative += n
+                lines.append(f'{metric}_bucket{{le="{bucket_floor(index + 1) / 1e9:.9g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+            lines.append(f"{metric}_sum {h.total / 1e9:.9g}")
+            lines.append(f"{metric}_count {h.count}")
+        for name in sorted(self.counters):
+            metric = _metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {self.counters[name]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+def _metric_name(name):
+    return "bank_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+REGISTRY = Registry()
+
+def _unchanged(func):
+    return func
+
+def timed(name):
+    # Decorator recording each call's latency under `name`; returns func itself when disabled
+    if not ENABLED:
+        return _unchanged
+    histogram = REGISTRY.histogram(name)
+    clock = time.perf_counter_ns
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+        return wrapper
+    return decorate
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+
+_NULL_TIMER = nullcontext()
+
+def timer(name):
+    # Context manager form of timed(). Disabled it is a shared no-op, but the call and the
+    # with-statement still cost a few hundred ns, so hot paths use the decorator instead.
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(REGISTRY.histogram(name))
+
+def count(name, n=1):
+    if ENABLED:
+        REGISTRY.count(name, n)
+
+def snapshot():
+    return REGISTRY.text()
+
+class SamplingProfiler:
+    # Samples every other thread's Python stack on a timer and counts folded stacks
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bank-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self):
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+def _at_exit(profiler, profile_path, metrics_path):
+    if profiler is not None:
+        profiler.stop()
+        profiler.write(profile_path)
+    if metrics_path:
+        REGISTRY.write_prometheus(metrics_path)
+
+_profile_path = os.environ.get("BANK_PROFILE")
+_profiler = None
+if _profile_path:
+    _profiler = SamplingProfiler(float(os.environ.get("BANK_PROFILE_INTERVAL", "5")) / 1000).start()
+if _profiler is not None or (ENABLED and os.environ.get("BANK_METRICS_FILE")):
+    atexit.register(_at_exit, _profiler, _profile_path, ENABLED and os.environ.get("BANK_METRICS_FILE"))
@@ -0,0 +1,159 @@
+# Bank-wide reports computed across a process pool: daily net flow per account type, the top-N
+# balances and overdraft attempts per account type. Accounts are split into partitions; each
+# worker flattens its partition's ledgers into a few columns and aggregates them in one pass,
+# and the parent merges the partial results. With the fork start method workers read the
+# accounts straight from the inherited memory, otherwise each partition is packed and sent.
+# A persistent bank is reported from its data directory: accounts it has open are read live,
+# every other journal there through a read-only mapping (overdraft attempts as of that account's
+# last snapshot). Results are cached until the bank's high-water mark (accounts, ledger rows,
+# overdraft attempts, all of which only grow) moves.
+import heapq
+import itertools
+import multiprocessing
+import os
+from array import array
+from collections import namedtuple
+from operator import add, floordiv, itemgetter, mul, sub
+
+from banking import Ledger, Money
+from journal import read_meta
+from units import DAY_MICROS, from_micros
+
+BankReport = namedtuple('BankReport', 'daily_net_flow top_balances overdraft_attempts')
+
+# An account on disk that the bank has not opened; account_id is None
+StoredAccount = namedtuple('StoredAccount', 'account_id account_holder account_type balance overdraft_attempts '
+                                            'transactions')
+
+PARTITIONS_PER_PROCESS = 4
+
+_snapshot = []  # accounts being reported on, inherited by forked workers
+
+def _stored(path):
+    meta = read_meta(path)
+    ledger = Ledger.mapped(path)
+    balance = ledger.balance_after(len(ledger) - 1) if len(ledger) else Money(ledger.opening)
+    return StoredAccount(None, meta['holder'], meta['account_type'], balance, meta.get('overdraft_attempts', 0),
+                         ledger)
+
+def _accounts(bank):
+    # The bank's accounts, and for a persistent bank every other journal in its data directory
+    accounts = list(bank)
+    data_dir = bank.data_dir
+    if not data_dir or not os.path.isdir(data_dir):
+        return accounts
+    opened = {os.path.abspath(account.journal.path) for account in accounts if account.journal is not None}
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.abspath(os.path.join(data_dir, name))
+        if name.endswith('.journal') and path not in opened and os.path.exists(path + '.snap'):
+            accounts.append(_stored(path))
+    return accounts
+
+def _pack(account):
+    # (balance cents, account_id, holder, account type, overdraft attempts, opening cents,
+    # timestamps, balances) of the rows published to readers: a forked worker can inherit a
+    # ledger mid-append, with some columns already a row longer than len(ledger) says
+    ledger = account.transactions
+    n = len(ledger)
+    if not ledger._base:
+        micros, balances = ledger.timestamps[:n], ledger.balances[:n]
+    else:
+        micros, balances = array('q'), array('q')
+        for chunk in ledger.chunks():
+            micros.extend(chunk.micros)
+            balances.extend(chunk.balances)
+    return (account.balance.cents, account.account_id, account.account_holder, account.account_type,
+            account.overdraft_attempts, ledger.opening, micros, balances)
+
+def _aggregate(packed, top_n):
+    # Partial aggregates of one partition: ({(type, day): net cents}, top balances, {type: attempts})
+    type_ids = {}
+    micros, nets, owners = array('q'), array('q'), array('B')
+    attempts = {}
+    for row in packed:
+        code = type_ids.setdefault(row[3], len(type_ids))
+        balances = row[7]
+        micros.extend(row[6])
+        # a row's net flow is the change it made to the running balance
+        nets.extend(map(sub, balances, itertools.chain((row[5],), balances)))
+        owners.extend(array('B', [code]) * len(balances))
+        attempts[row[3]] = attempts.get(row[3], 0) + row[4]
+    width = max(len(type_ids), 1)
+    keys = map(add, map(mul, map(floordiv, micros, itertools.repeat(DAY_MICROS)), itertools.repeat(width)), owners)
+    flow = {}
+    get = flow.get
+    for key, net in zip(keys, nets):
+        flow[key] = get(key, 0) + net
+    names = list(type_ids)
+    flow = {(names[key % width], key // width): net for key, net in flow.items()}
+    top = heapq.nlargest(top_n, (row[:4] for row in packed), key=itemgetter(0))
+    return flow, top, attempts
+
+def _work(job):
+    lo, hi, packed, top_n = job
+    if packed is None:
+        packed = map(_pack, _snapshot[lo:hi])
+    return _aggregate(list(packed), top_n)
+
+def high_water_mark(accounts):
+    rows = attempts = 0
+    for account in accounts:
+        rows += len(account.transactions)
+        attempts += account.overdraft_attempts
+    return len(accounts), rows, attempts
+
+class ReportEngine:
+    def __init__(self, bank, processes=None, partitions_per_process=PARTITIONS_PER_PROCESS):
+        self.bank = bank
+        self.processes = processes or os.cpu_count() or 1
+        self.partitions_per_process = partitions_per_process
+        self._cache = {}  # top_n -> (high-water mark, BankReport)
+
+    def report(self, top_n=10):
+        accounts = _accounts(self.bank)
+        try:
+            mark = high_water_mark(accounts)
+            cached = self._cache.get(top_n)
+            if cached is not None and cached[0] == mark:
+                return cached[1]
+            result = self._merge(self._partials(accounts, top_n), top_n)
+            self._cache[top_n] = (mark, result)
+            return result
+        finally:
+            for account in accounts:
+                if type(account) is StoredAccount:
+                    account.transactions.close()
+
+    def _partials(self, accounts, top_n):
+        global _snapshot
+        if self.processes <= 1 or len(accounts) < 2:
+            return [_aggregate(list(map(_pack, accounts)), top_n)]
+        parts = min(len(accounts), self.processes * self.partitions_per_process)
+        bounds = [len(accounts) * k // parts for k in range(parts + 1)]
+        forking = 'fork' in multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if forking else None)
+        if forking:
+            jobs = [(lo, hi, None, top_n) for lo, hi in zip(bounds, bounds[1:])]
+            _snapshot = accounts
+        else:
+            jobs = [(lo, hi, list(map(_pack, accounts[lo:hi])), top_n) for lo, hi in zip(bounds, bounds[1:])]
+        try:
+            with context.Pool(self.processes) as pool:
+                return pool.map(_work, jobs, chunksize=1)
+        finally:
+            _snapshot = []
+
+    @staticmethod
+    def _merge(partials, top_n):
+        flow, attempts = {}, {}
+        for part_flow, _, part_attempts in partials:
+            for key, net in part_flow.items():
+                flow[key] = flow.get(key, 0) + net
+            for kind, count in part_attempts.items():
+                attempts[kind] = attempts.get(kind, 0) + count
+        daily = {}
+        for (kind, day), net in sorted(flow.items()):
+            daily.setdefault(kind, {})[from_micros(day * DAY_MICROS).date()] = Money(net)
+        top = heapq.nlargest(top_n, itertools.chain.from_iterable(part[1] for part in partials), key=itemgetter(0))
+        top_balances = [(Money(cents), account_id, holder, kind) for cents, account_id, holder, kind in top]
+        return BankReport(daily, top_balances, attempts)
@@ -0,0 +1,246 @@
+# Headless JSON-lines service over a Bank, on TCP ("host:port") or a Unix socket ("unix:/path").
+# One JSON object per line in, one per line out, matched up by "id":
+#   {"id": 1, "op": "deposit", "account": "alice", "amount": "25.00"}
+#   {"id": 1, "ok": true, "balance": "125.00"}
+#   {"id": 2, "ok": false, "error": "Insufficient funds."}
+# Ops: open (holder, balance, account_type), balance, deposit, withdraw, transfer (to),
+# history (limit, cursor). "account" is a holder name or an account ID. deposit, withdraw and
+# transfer take an optional "request_id": a retry with the same one within the account's dedup
+# window gets the original response without posting again.
+# Requests may be pipelined. Operations on one account run one at a time in arrival order from
+# a bounded per-account queue (a transfer queues on its source account); responses for
+# different accounts can come back out of order. A full queue, or too many unanswered
+# requests on a connection, stops that connection being read until work drains.
+# Usage: python server.py [--data-dir DIR] ADDRESS
+import argparse
+import asyncio
+import json
+import os
+import threading
+
+from banking import DATA_DIR, Bank
+
+QUEUE_SIZE = 1024    # queued operations per account
+MAX_INFLIGHT = 256   # unanswered requests per connection
+MAX_PAGE = 1000      # rows per history response
+_STREAM_LIMIT = 1 << 16
+
+class BankServer:
+    def __init__(self, bank, queue_size=QUEUE_SIZE, max_inflight=MAX_INFLIGHT):
+        self.bank = bank
+        self.queue_size = queue_size
+        self.max_inflight = max_inflight
+        self._queues = {}
+        self._workers = []
+        # Journal-backed postings fsync, so they run off the event loop
+        self._blocking = bool(getattr(bank, 'data_dir', None))
+
+    async def listen(self, address):
+        if address.startswith("unix:"):
+            return await asyncio.start_unix_server(self.handle_client, address[5:], limit=_STREAM_LIMIT)
+        host, _, port = address.rpartition(":")
+        return await asyncio.start_server(self.handle_client, host or None, int(port), limit=_STREAM_LIMIT)
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    async def handle_client(self, reader, writer):
+        out = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_inflight)
+        pending = set()
+        sender = asyncio.create_task(self._send(writer, out, slots))
+        try:
+            while True:
+                await slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    slots.release()
+                    break
+                future = await self.submit(line)
+                pending.add(future)
+                future.add_done_callback(pending.discard)
+                future.add_done_callback(out.put_nowait)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            if pending:
+                await asyncio.wait(pending)
+            out.put_nowait(None)
+            await sender
+
+    async def _send(self, writer, out, slots):
+        try:
+            while True:
+                future = await out.get()
+                if future is None:
+                    break
+                writer.write(future.result())
+                slots.release()
+                if out.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def submit(self, line):
+        # Returns a future resolving to the encoded response line
+        future = asyncio.get_running_loop().create_future()
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+            op = request["op"]
+            if op == "open":
+                future.set_result(_reply(request, await self._call(self._open, request)))
+                return future
+            account = self.bank.resolve(request["account"])
+        except Exception as exc:
+            future.set_result(_error(request, exc))
+            return future
+        queue = self._queues.get(account.account_id)
+        if queue is None:
+            queue = self._queues[account.account_id] = asyncio.Queue(self.queue_size)
+            self._workers.append(asyncio.create_task(self._work(queue)))
+        await queue.put((request, account, future))
+        return future
+
+    async def _call(self, func, *args):
+        if self._blocking:
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return func(*args)
+
+    async def _work(self, queue):
+        while True:
+            request, account, future = await queue.get()
+            try:
+                response = _reply(request, await self._call(self.execute, request, account))
+            except Exception as exc:
+                response = _error(request, exc)
+            if not future.done():
+                future.set_result(response)
+
+    def _open(self, request):
+        account = self.bank.open_account(request["holder"], request.get("balance", 0),
+                                         request.get("account_type", 'Savings'))
+        return {"account_id": account.account_id, "balance": f"{account.balance:.2f}"}
+
+    def execute(self, request, account):
+        op = request["op"]
+        request_id = request.get("request_id")
+        if op == "deposit":
+            return {"balance": f"{account.deposit(request['amount'], request_id):.2f}"}
+        elif op == "withdraw":
+            return {"balance": f"{account.withdraw(request['amount'], request_id):.2f}"}
+        elif op == "transfer":
+            target = self.bank.resolve(request["to"])
+            balance, to_balance = account.transfer(request["amount"], target, request_id)
+            return {"balance": f"{balance:.2f}", "to_balance": f"{to_balance:.2f}"}
+        elif op == "history":
+            limit, cursor = _history_limit(request.get("limit", 50)), request.get("cursor")
+            if cursor is not None and (type(cursor) is not int or cursor < 0):
+                raise ValueError("cursor must be one returned by a previous history response.")
+            rows, cursor = account.page(limit, cursor, newest_first=True)
+            return {"rows": [[t[0], f"{t[1]:.2f}", t[2].isoformat(), t[3]] for t in rows], "cursor": cursor}
+        elif op != "balance":
+            raise ValueError(f"Unknown operation: {op}")
+        return {"balance": f"{account.balance:.2f}"}
+
+def _history_limit(value):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = 0
+    if not 1 <= limit <= MAX_PAGE:
+        raise ValueError(f"limit must be a whole number from 1 to {MAX_PAGE}.")
+    return limit
+
+def _reply(request, result):
+    return (json.dumps({"id": request.get("id"), "ok": True, **result}) + "\n").encode()
+
+def _error(request, exc):
+    message = exc.args[0] if isinstance(exc, KeyError) and exc.args else str(exc)
+    if isinstance(exc, KeyError) and not message.startswith("No account"):
+        message = f"Missing field: {message}"
+    request = request if isinstance(request, dict) else {}
+    return (json.dumps({"id": request.get("id"), "ok": False, "error": message}) + "\n").encode()
+
+class ServerThread(threading.Thread):
+    # Runs a BankServer on its own event loop, e.g. next to the Tk mainloop sharing its Bank
+    def __init__(self, bank, address, **options):
+        super().__init__(name="bank-server", daemon=True)
+        self.bank = bank
+        self.address = address
+        self.options = options
+        self.ready = threading.Event()
+        self.error = None
+        self.sockname = None  # bound address, e.g. to find the port picked for "host:0"
+        self._loop = None
+        self._stopping = None
+
+    def run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.ready.set()
+            self._loop.close()
+
+    async def _serve(self):
+        self._stopping = asyncio.Event()
+        server = BankServer(self.bank, **self.options)
+        listener = await server.listen(self.address)
+        self.sockname = listener.sockets[0].getsockname()
+        self.ready.set()
+        async with listener:
+            await self._stopping.wait()
+        await server.close()
+
+    def start(self):
+        super().start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        if self._stopping is not None and self.is_alive():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        self.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve bank accounts over JSON lines.")
+    parser.add_argument("address", help="host:port or unix:/path/to/socket")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="journal directory ('' keeps accounts in memory)")
+    parser.add_argument("--commit-window", type=float, default=0.0, metavar="SECONDS",
+                        help="group-commit window for journal writes (default: 0, fsync every posting)")
+    args = parser.parse_args(argv)
+    bank = Bank(args.data_dir or None, commit_window=args.commit_window)
+    server = BankServer(bank)
+
+    async def run():
+        listener = await server.listen(args.address)
+        async with listener:
+            try:
+                await listener.serve_forever()
+            finally:
+                await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bank.close()
+        if args.address.startswith("unix:") and os.path.exists(args.address[5:]):
+            os.unlink(args.address[5:])
+
+if __name__ == "__main__":
+    main()
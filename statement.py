@@ -0,0 +1,163 @@
+import csv
+import gzip
+import itertools
+import struct
+import sys
+import zlib
+from array import array
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from operator import sub
+
+from units import format_cents, from_micros, to_micros
+
+# Statements stream as chunks of columns. kinds and statuses index into the chunk's
+# type_names / status_names tables; times are epoch microseconds, money is integer cents.
+Chunk = namedtuple('Chunk', 'micros cents balances kinds statuses type_names status_names')
+
+CHUNK_ROWS = 65_536
+CSV_HEADER = ["date", "type", "amount", "balance", "status"]
+
+# Columnar layout: MAGIC, a flags byte, the type and status name tables, then chunks of
+# <rows, payload bytes, CRC32 of the stored payload> followed by the payload: timestamp deltas,
+# amounts and balances as little-endian int64 columns, then type and status codes as bytes.
+# A chunk header with 0 rows ends the file. COMPRESSED chunks are zlib'ed payloads.
+MAGIC = b"BKSTMT1\0"
+COMPRESSED = 1
+_CHUNK = struct.Struct("<III")
+_COUNT = struct.Struct("<H")
+_SWAP = sys.byteorder != "little"
+
+def is_csv(path):
+    return path.endswith((".csv", ".csv.gz"))
+
+def write(path, chunks, type_names, status_names, compress=False):
+    # CSV for *.csv (gzip'ed for *.csv.gz), the columnar format otherwise. Returns rows written.
+    if is_csv(path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", newline="", encoding="utf-8") as f:
+            return write_csv(f, chunks)
+    with open(path, "wb") as f:
+        return write_columnar(f, chunks, type_names, status_names, compress)
+
+def read(path, chunk_rows=CHUNK_ROWS):
+    # Generator of Chunks from a file written by write()
+    if is_csv(path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", newline="", encoding="utf-8") as f:
+            yield from read_csv(f, chunk_rows)
+    else:
+        with open(path, "rb") as f:
+            yield from read_columnar(f)
+
+def _parse_cents(text):
+    whole, _, frac = text.partition(".")
+    if len(frac) == 2:
+        return int(whole + frac)
+    return int(Decimal(text).scaleb(2).to_integral_value())
+
+def write_csv(f, chunks):
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    rows = 0
+    for chunk in chunks:
+        dates = [from_micros(us).isoformat(" ") for us in chunk.micros]
+        writer.writerows(zip(dates, map(chunk.type_names.__getitem__, chunk.kinds),
+                             map(format_cents, chunk.cents), map(format_cents, chunk.balances),
+                             map(chunk.status_names.__getitem__, chunk.statuses)))
+        rows += len(dates)
+    return rows
+
+def read_csv(f, chunk_rows=CHUNK_ROWS):
+    reader = csv.reader(f)
+    if next(reader, None) != CSV_HEADER:
+        raise ValueError("Not a statement CSV: unexpected header")
+    type_names, status_names = [], []
+    type_codes, status_codes = {}, {}
+    while True:
+        rows = list(itertools.islice(reader, chunk_rows))
+        if not rows:
+            return
+        dates, kinds, amounts, balances, statuses = zip(*rows)
+        for name in set(kinds).difference(type_codes):
+            type_codes[name] = len(type_names)
+            type_names.append(name)
+        for name in set(statuses).difference(status_codes):
+            status_codes[name] = len(status_names)
+            status_names.append(name)
+        micros = array('q', [to_micros(datetime.fromisoformat(d)) for d in dates])
+        yield Chunk(micros, array('q', map(_parse_cents, amounts)), array('q', map(_parse_cents, balances)),
+                    array('B', map(type_codes.__getitem__, kinds)), array('B', map(status_codes.__getitem__, statuses)),
+                    list(type_names), list(status_names))
+
+def _write_names(f, names):
+    f.write(_COUNT.pack(len(names)))
+    for name in names:
+        data = name.encode("utf-8")
+        f.write(_COUNT.pack(len(data)) + data)
+
+def _read_exact(f, n):
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError("Truncated statement")
+    return data
+
+def _read_names(f):
+    names = []
+    for _ in range(_COUNT.unpack(_read_exact(f, 2))[0]):
+        names.append(_read_exact(f, _COUNT.unpack(_read_exact(f, 2))[0]).decode("utf-8"))
+    return names
+
+def _le(column):
+    if _SWAP:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+def write_columnar(f, chunks, type_names, status_names, compress=False):
+    f.write(MAGIC + bytes([COMPRESSED if compress else 0]))
+    _write_names(f, type_names)
+    _write_names(f, status_names)
+    rows = 0
+    for chunk in chunks:
+        n = len(chunk.micros)
+        if not n:
+            continue
+        deltas = array('q', map(sub, chunk.micros, itertools.chain((0,), chunk.micros)))
+        payload = b"".join(_le(column).tobytes() for column in
+                           (deltas, chunk.cents, chunk.balances, chunk.kinds, chunk.statuses))
+        if compress:
+            payload = zlib.compress(payload, 1)
+        f.write(_CHUNK.pack(n, len(payload), zlib.crc32(payload)))
+        f.write(payload)
+        rows += n
+    f.write(_CHUNK.pack(0, 0, 0))
+    return rows
+
+def read_columnar(f):
+    if _read_exact(f, len(MAGIC)) != MAGIC:
+        raise ValueError("Not a columnar statement")
+    compressed = _read_exact(f, 1)[0] & COMPRESSED
+    type_names = _read_names(f)
+    status_names = _read_names(f)
+    while True:
+        n, size, crc = _CHUNK.unpack(_read_exact(f, _CHUNK.size))
+        if not n:
+            return
+        payload = _read_exact(f, size)
+        if zlib.crc32(payload) != crc:
+            raise ValueError("Corrupt statement chunk")
+        if compressed:
+            payload = zlib.decompress(payload)
+        columns = []
+        offset = 0
+        for typecode, width in (('q', 8), ('q', 8), ('q', 8), ('B', 1), ('B', 1)):
+            column = array(typecode)
+            column.frombytes(payload[offset:offset + n * width])
+            if _SWAP:
+                column.byteswap()
+            columns.append(column)
+            offset += n * width
+        columns[0] = array('q', itertools.accumulate(columns[0]))
+        yield Chunk(*columns, type_names, status_names)
@@ -0,0 +1,115 @@
+# The Bank registry: one journal per holder on disk, and lookups by holder name.
+import os
+import tempfile
+import unittest
+
+from banking import Bank, BankAccount, _legacy_account_path, account_path
+from server import BankServer
+
+class AccountPathTest(unittest.TestCase):
+    def test_distinct_holders_get_distinct_files(self):
+        names = ["李雷", "王芳", "John Smith", "john_smith", "john-smith", "johnsmith", "_", "", "Zoë", "zoe"]
+        paths = {account_path(name, "d") for name in names}
+        self.assertEqual(len(paths), len(names))
+
+    def test_same_holder_key_same_file(self):
+        self.assertEqual(account_path(" Alice ", "d"), account_path("alice", "d"))
+        self.assertEqual(account_path("alice", "d"), os.path.join("d", "alice.journal"))
+
+    def test_long_names_stay_within_filename_limits(self):
+        paths = {account_path(c * 300, "d") for c in "李王"}
+        self.assertEqual(len(paths), 2)
+        self.assertTrue(all(len(os.path.basename(p)) < 255 for p in paths))
+
+class PersistentBankTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.bank = Bank(self.directory.name)
+
+    def tearDown(self):
+        self.bank.close()
+        self.directory.cleanup()
+
+    def test_non_ascii_holders_are_separate_accounts(self):
+        li = self.bank.open_account("李雷", 100)
+        wang = self.bank.open_account("王芳", 50)
+        self.assertIsNot(li, wang)
+        li.deposit(10)
+        wang.withdraw(5)
+        self.bank.close()
+        reopened = Bank(self.directory.name)
+        self.assertEqual(reopened.find("李雷").balance, 110)
+        self.assertEqual(reopened.find("王芳").balance, 45)
+        self.assertEqual(reopened.find("王芳").account_holder, "王芳")
+        reopened.close()
+
+    def test_similar_ascii_holders_are_separate_accounts(self):
+        self.bank.open_account("John Smith", 1)
+        self.bank.open_account("john_smith", 2)
+        self.bank.close()
+        reopened = Bank(self.directory.name)
+        self.assertEqual(reopened.find("john smith").balance, 1)
+        self.assertEqual(reopened.find("JOHN_SMITH").balance, 2)
+        reopened.close()
+
+    def test_account_open_in_another_bank_is_refused(self):
+        self.bank.open_account("alice", 100).deposit(10)
+        other = Bank(self.directory.name)
+        with self.assertRaisesRegex(ValueError, "open in another session"):
+            other.find("alice")
+        with self.assertRaisesRegex(ValueError, "open in another session"):
+            other.open_account("alice", 5)
+        self.bank.close()
+        self.assertEqual(other.find("alice").balance, 110)
+        other.close()
+
+    def test_legacy_journal_only_for_its_own_holder(self):
+        # a journal under the old lossy slug, written by "John Smith"
+        path = _legacy_account_path("John Smith", self.directory.name)
+        BankAccount.create(path, "John Smith", 7).close()
+        self.assertIsNone(self.bank.find("john_smith"))
+        self.assertEqual(self.bank.find("John Smith").balance, 7)
+        self.assertEqual(self.bank.open_account("john_smith", 3).balance, 3)
+
+class OpenAccountTest(unittest.TestCase):
+    def test_rules(self):
+        bank = Bank()
+        for holder, balance, account_type in (("", 1, 'Savings'), ("  ", 1, 'Savings'), (None, 1, 'Savings'),
+                                              ("Neg", -100, 'Savings'), ("Neg", "-0.01", 'Savings'),
+                                              ("Bad", "abc", 'Savings'), ("Type", 1, 'Crypto')):
+            with self.assertRaises(ValueError):
+                bank.open_account(holder, balance, account_type)
+        self.assertEqual(len(bank), 0)
+        self.assertEqual(bank.open_account("Zero", 0).balance, 0)
+
+class ServerRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.bank = Bank()
+        self.server = BankServer(self.bank)
+        self.account = self.bank.open_account("alice", 100)
+        for _ in range(5):
+            self.account.deposit(1)
+
+    def test_open_rejects_negative_balance(self):
+        with self.assertRaisesRegex(ValueError, "negative"):
+            self.server._open({"op": "open", "holder": "bob", "balance": -100})
+        self.assertIsNone(self.bank.find("bob"))
+
+    def test_boolean_amount_is_refused(self):
+        with self.assertRaisesRegex(TypeError, "Invalid amount"):
+            self.server.execute({"op": "deposit", "amount": True}, self.account)
+        self.assertEqual(self.account.balance, 105)
+
+    def test_history_limit(self):
+        for limit in (-1, 0, "x", None, 10_000):
+            with self.assertRaisesRegex(ValueError, "limit"):
+                self.server.execute({"op": "history", "limit": limit}, self.account)
+        page = self.server.execute({"op": "history", "limit": "2"}, self.account)
+        self.assertEqual(len(page["rows"]), 2)
+        rest = self.server.execute({"op": "history", "limit": 10, "cursor": page["cursor"]}, self.account)
+        self.assertEqual(len(rest["rows"]), 3)
+        with self.assertRaisesRegex(ValueError, "cursor"):
+            self.server.execute({"op": "history", "cursor": -3}, self.account)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# apply_batch: rows rejected one by one, and the same cents as the per-call methods.
+import random
+import unittest
+from decimal import Decimal
+
+from banking import BankAccount, Money, to_cents
+
+class ApplyBatchTest(unittest.TestCase):
+    def test_bad_amounts_rejected_per_row(self):
+        account = BankAccount("Batch", 10)
+        result = account.apply_batch([("deposit", "abc"), ("deposit", None), ("deposit", float("inf")),
+                                      ("deposit", float("nan")), ("deposit", Decimal("NaN")), ("deposit", 5),
+                                      ("Withdraw", 2.5), ("deposit", "1.234"), ("bogus", 1), ("deposit", -1)])
+        self.assertEqual(result.accepted, 2)
+        self.assertEqual([index for index, _ in result.rejected], [0, 1, 2, 3, 4, 7, 8, 9])
+        self.assertEqual(result.rejected[0], (0, "Invalid amount 'abc'."))
+        self.assertEqual(result.rejected[6], (8, "Unknown operation 'bogus'."))
+        self.assertEqual(result.rejected[7], (9, "Deposit amount must be positive."))
+        self.assertEqual(account.balance, Money.parse("12.50"))
+
+    def test_overdrafts_rejected_per_row(self):
+        account = BankAccount("Batch", 10)
+        result = account.apply_batch([("withdraw", 20), ("deposit", 5), ("withdraw", 15), ("withdraw", 1)])
+        self.assertEqual(result, (2, [(0, "Insufficient funds."), (3, "Insufficient funds.")]))
+        self.assertEqual(account.balance, 0)
+        self.assertEqual(account.overdraft_attempts, 2)
+
+    def test_same_cents_as_per_call(self):
+        rng = random.Random(5)
+        amounts = [rng.choice([rng.random() * 1000, rng.randint(1, 1000), rng.randint(1, 99_999) / 100])
+                   for _ in range(5000)]
+        batched = BankAccount("Batch", 0)
+        batched.apply_batch([("deposit", amount) for amount in amounts])
+        self.assertEqual(list(batched.transactions.amounts), [to_cents(amount) for amount in amounts])
+
+if __name__ == "__main__":
+    unittest.main()
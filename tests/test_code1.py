@@ -0,0 +1,19 @@
+# The dashboard module keeps exposing the account model it used to define.
+import importlib.util
+import unittest
+
+import banking
+
+MODEL_NAMES = ["ACCOUNT_TYPES", "DATA_DIR", "TXN_STATUSES", "TXN_TYPES", "Bank", "BankAccount", "BatchResult",
+               "Ledger", "Money", "account_path", "format_cents", "from_micros", "holder_key", "to_cents",
+               "to_micros"]
+
+@unittest.skipIf(importlib.util.find_spec("tkinter") is None, "needs tkinter")
+class ReExportTest(unittest.TestCase):
+    def test_model_names(self):
+        import Code1
+        for name in MODEL_NAMES:
+            self.assertIs(getattr(Code1, name), getattr(banking, name), name)
+
+if __name__ == "__main__":
+    unittest.main()
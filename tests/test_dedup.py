@@ -0,0 +1,110 @@
+# Idempotent postings: expiry and capacity of the dedup index on a fake clock, and request_ids
+# reused for the same or a different posting.
+import unittest
+
+from banking import BankAccount, DedupIndex, Money
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class DedupIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_key_expires_after_window(self):
+        index = DedupIndex(window=10.0, capacity=100, clock=self.clock)
+        index.add("a", ("Deposit", 100), "first")
+        self.clock.now = 9.9
+        self.assertEqual(index.get("a", ("Deposit", 100)), (True, "first"))
+        self.clock.now = 10.0
+        self.assertEqual(index.get("a", ("Deposit", 100)), (False, None))
+
+    def test_expired_keys_dropped_and_reusable(self):
+        index = DedupIndex(window=10.0, capacity=100, clock=self.clock)
+        index.add("a", ("Deposit", 100), "first")
+        self.clock.now = 10.0
+        index.add("b", ("Deposit", 5), "second")
+        self.assertEqual(len(index), 1)
+        index.add("a", ("Withdrawal", 7), "third")
+        self.assertEqual(index.get("a", ("Withdrawal", 7)), (True, "third"))
+        self.assertEqual(index.evicted_live, 0)
+
+    def test_full_ring_evicts_oldest_live_key(self):
+        index = DedupIndex(window=10.0, capacity=3, clock=self.clock)
+        for key in "abcd":
+            index.add(key, None, key)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.evicted_live, 1)
+        self.assertEqual(index.get("a", None), (False, None))
+        self.assertEqual(index.get("d", None), (True, "d"))
+
+    def test_memory_bounded_by_capacity(self):
+        index = DedupIndex(window=10.0, capacity=64, clock=self.clock)
+        for i in range(10_000):
+            index.add(i, None, i)
+        self.assertEqual(len(index), 64)
+        self.assertEqual(len(index._ring), 64)
+
+    def test_different_fingerprint_raises(self):
+        index = DedupIndex(window=10.0, capacity=3, clock=self.clock)
+        index.add("a", ("Deposit", 100), "first")
+        with self.assertRaises(ValueError):
+            index.get("a", ("Deposit", 101))
+
+class IdempotentPostingTest(unittest.TestCase):
+    def setUp(self):
+        self.account = BankAccount("Dedup", 100.0)
+
+    def test_repeated_deposit_posts_once(self):
+        self.assertEqual(self.account.deposit(25, "r1"), Money.parse("125"))
+        self.assertEqual(self.account.deposit(25, "r1"), Money.parse("125"))
+        self.assertEqual(len(self.account.transactions), 1)
+        self.assertEqual(self.account.balance, Money.parse("125"))
+
+    def test_request_id_reused_for_different_posting(self):
+        self.account.deposit(25, "r1")
+        with self.assertRaises(ValueError):
+            self.account.deposit(30, "r1")
+        with self.assertRaises(ValueError):
+            self.account.withdraw(25, "r1")
+        self.assertEqual(len(self.account.transactions), 1)
+
+    def test_refused_posting_can_be_retried(self):
+        with self.assertRaises(ValueError):
+            self.account.withdraw(500, "r2")
+        self.account.deposit(400, "r3")
+        self.assertEqual(self.account.withdraw(500, "r2"), Money.parse("0"))
+
+    def test_repeated_transfer_posts_once(self):
+        target = BankAccount("Dedup Target")
+        first = self.account.transfer(5, target, "r4")
+        self.assertEqual(self.account.transfer(5, target, "r4"), first)
+        self.assertEqual(len(target.transactions), 1)
+
+    def test_repeated_batch_posts_once(self):
+        batch = [("deposit", 1), ("withdraw", 10_000)]
+        first = self.account.apply_batch(batch, "r5")
+        self.assertEqual(self.account.apply_batch(batch, "r5"), first)
+        self.assertEqual(len(self.account.transactions), 1)
+
+    def test_batch_names_normalized_before_fingerprint(self):
+        self.assertEqual(self.account.apply_batch([("Deposit", 5)], "r6").accepted, 1)
+        self.assertEqual(self.account.apply_batch([("DEPOSIT", 5)], "r6").accepted, 1)
+        with self.assertRaises(ValueError):
+            self.account.apply_batch([("Withdraw", 5)], "r6")
+        self.assertEqual(self.account.balance, Money.parse("105"))
+
+    def test_different_batch_same_request_id(self):
+        self.account.apply_batch([("deposit", 1), ("deposit", 2)], "r7")
+        for other in ([("deposit", 2), ("deposit", 1)], [("deposit", 1)], [("deposit", 1), ("withdraw", 2)],
+                      [("deposit", 1), ("deposit", 2), ("bogus", 3)]):
+            with self.assertRaises(ValueError):
+                self.account.apply_batch(other, "r7")
+        self.assertEqual(len(self.account.transactions), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+# Journal-backed accounts: crash recovery from a torn record and reopening after it, failed
+# writes, and the lock that keeps a journal to one writer.
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from banking import Bank, BankAccount, Ledger
+from journal import RECORD_SIZE
+
+class RecoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "torn.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_truncated_mid_record(self):
+        account = BankAccount.create(self.path, "Torn", 10.0, snapshot_every=4)
+        for _ in range(10):
+            account.deposit(2.5)
+        account.journal.sync()
+        account.journal._file.close()  # crash: no final snapshot
+        with open(self.path, "r+b") as f:
+            f.truncate(10 * RECORD_SIZE - RECORD_SIZE // 2)
+        recovered = BankAccount.open(self.path)
+        self.assertEqual(len(recovered.transactions), 9)
+        self.assertEqual(recovered.balance, 10.0 + 9 * 2.5)
+        self.assertEqual(os.path.getsize(self.path), 9 * RECORD_SIZE)
+        recovered.deposit(1.0)
+        recovered.close()
+        reopened = BankAccount.open(self.path)
+        self.assertEqual(len(reopened.transactions), 10)
+        self.assertEqual(reopened.balance, 10.0 + 9 * 2.5 + 1.0)
+        reopened.close()
+
+def disk_full(*args):
+    raise OSError(28, "No space left on device")
+
+class FailedWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "full.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_failed_posting_is_not_applied(self):
+        account = BankAccount.create(self.path, "Full", 100)
+        account.deposit(10)
+        with mock.patch("journal.os.fsync", disk_full):
+            for post in (lambda: account.deposit(5), lambda: account.withdraw(5),
+                         lambda: account.apply_batch([('deposit', 1), ('withdraw', 2)])):
+                with self.assertRaises(OSError):
+                    post()
+        self.assertEqual(account.balance, 110)
+        self.assertEqual(len(account.transactions), 1)
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE)
+        account.deposit(1)
+        account.close()
+        reopened = BankAccount.open(self.path)
+        self.assertEqual(reopened.balance, 111)
+        self.assertEqual([row[1] for row in reopened.transactions], [10, 1])
+        reopened.close()
+
+    def test_failed_group_commit_is_retried_and_reported(self):
+        account = BankAccount.create(self.path, "Full", 100, commit_window=60)
+        account.deposit(10)  # buffered until the window ends
+        with mock.patch("journal.os.fsync", disk_full):
+            account.journal._commit()  # the window's timer: the error is kept, not lost
+            with self.assertRaises(OSError):
+                account.deposit(5)
+        self.assertEqual(account.balance, 110)
+        account.deposit(1)  # commits the pending deposit first, then buffers its own
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE)
+        account.close()
+        reopened = BankAccount.open(self.path)
+        self.assertEqual(reopened.balance, 111)
+        reopened.close()
+
+    def test_failed_transfer_credit_reverses_the_debit(self):
+        bank = Bank(self.directory.name)
+        alice, bob = bank.open_account("alice", 100), bank.open_account("bob", 0)
+        with mock.patch.object(bob.journal, "append", side_effect=OSError(28, "No space left on device")):
+            with self.assertRaises(OSError):
+                bank.transfer("alice", "bob", 40)
+        self.assertEqual((alice.balance, bob.balance), (100, 0))
+        bank.close()
+        bank = Bank(self.directory.name)
+        self.assertEqual([row[:2] for row in bank.find("alice").transactions],
+                         [('Transfer Sent', 40), ('Transfer Received', 40)])
+        self.assertEqual((bank.find("alice").balance, bank.find("bob").balance), (100, 0))
+        bank.close()
+
+    def test_bank_passes_journal_options(self):
+        bank = Bank(self.directory.name, commit_window=0.5, snapshot_every=7)
+        journal = bank.open_account("alice", 1).journal
+        self.assertEqual((journal.commit_window, journal.snapshot_every), (0.5, 7))
+        bank.close()
+        bank = Bank(self.directory.name, commit_window=0.25)
+        self.assertEqual(bank.find("alice").journal.commit_window, 0.25)
+        bank.close()
+
+class WriterLockTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "locked.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_one_writer_at_a_time(self):
+        account = BankAccount.create(self.path, "Locked", 100)
+        with self.assertRaisesRegex(BlockingIOError, "already open"):
+            BankAccount.open(self.path)
+        account.deposit(10)
+        reader = Ledger.mapped(self.path)  # readers need no lock
+        self.assertEqual(reader.balance_after(0), 110)
+        reader.close()
+        account.close()
+        reopened = BankAccount.open(self.path)
+        self.assertEqual(reopened.balance, 110)
+        reopened.close()
+
+class MappedViewTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "m.journal")
+        account = BankAccount.create(self.path, "Mapped", 10.0)
+        for _ in range(100):
+            account.deposit(1.0)
+        account.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_descriptors(self):
+        return len(os.listdir("/proc/self/fd"))
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc")
+    def test_close_releases_the_map(self):
+        before = self.open_descriptors()
+        for _ in range(50):
+            account = BankAccount.open(self.path)
+            self.assertEqual(account.transactions.balance_after(99), 110.0)
+            account.close()
+        self.assertEqual(self.open_descriptors(), before)
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc")
+    def test_iterating_reads_through_the_map_until_close(self):
+        before = self.open_descriptors()
+        account = BankAccount.open(self.path)
+        rows = list(account.transactions)
+        self.assertEqual(self.open_descriptors(), before + 2)  # the journal's own file and the map
+        self.assertEqual(account.transactions._base, 100)
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(account.transactions.row(99), rows[99])
+        account.close()
+        self.assertEqual(self.open_descriptors(), before)
+
+if __name__ == "__main__":
+    unittest.main()
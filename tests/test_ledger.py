@@ -0,0 +1,139 @@
+# The columnar Ledger: queries over journal-backed rows, which must give the same answers as an
+# in-memory ledger without loading the history, and rows published to readers on other threads.
+import os
+import random
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from banking import BankAccount, Ledger
+
+START = datetime(2024, 1, 1)
+
+def post(account, rng, n):
+    when = START
+    for _ in range(n):
+        when += timedelta(hours=rng.randint(0, 30))
+        kind = rng.choice(['Deposit', 'Deposit', 'Withdrawal'])
+        cents = rng.randint(1, 20_000)
+        if kind == 'Withdrawal' and cents > account._cents:
+            kind = 'Deposit'
+        account._cents += cents if kind == 'Deposit' else -cents
+        account._record(kind, cents, when)
+
+class JournalBackedQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "q.journal")
+        account = BankAccount.create(path, "Query", 1000)
+        post(account, random.Random(8), 3000)
+        account.close()
+        self.account = BankAccount.open(path)
+        # rows posted after reopening live in memory, past the journal's base
+        post(self.account, random.Random(9), 200)
+        self.expected = BankAccount("Memory", 1000)
+        post(self.expected, random.Random(8), 3000)
+        post(self.expected, random.Random(9), 200)
+        self.ledger = self.account.transactions
+
+    def tearDown(self):
+        self.account.close()
+        self.directory.cleanup()
+
+    def ranges(self):
+        rng = random.Random(10)
+        for _ in range(50):
+            a = START + timedelta(hours=rng.randint(-100, 3000 * 16))
+            yield a, a + timedelta(hours=rng.randint(0, 2000))
+
+    def test_queries_match_in_memory_ledger(self):
+        expected = self.expected.transactions
+        for start, end in self.ranges():
+            self.assertEqual(self.ledger.bounds(start, end), expected.bounds(start, end))
+            self.assertEqual(self.account.balance_at(start), self.expected.balance_at(start))
+            self.assertEqual(self.account.totals(start, end), self.expected.totals(start, end))
+            self.assertEqual(list(self.account.query(start, end, 'Withdrawal', newest_first=True)),
+                             list(self.expected.query(start, end, 'Withdrawal', newest_first=True)))
+        self.assertEqual(self.account.monthly_statement(), self.expected.monthly_statement())
+        self.assertEqual(self.ledger.columns(range(3100, 2900, -1)), expected.columns(range(3100, 2900, -1)))
+
+    def test_queries_do_not_load_the_history(self):
+        for start, end in self.ranges():
+            self.account.balance_at(start)
+            list(self.account.query(start, end))
+            self.account.totals(start, end)
+        self.assertEqual(self.ledger._base, 3000)
+        self.assertEqual(len(self.ledger.amounts), 200)
+
+    def test_iteration_matches_in_memory_ledger(self):
+        expected = self.expected.transactions
+        self.assertEqual(list(self.ledger), list(expected))
+        self.assertEqual(list(reversed(self.ledger)), list(reversed(expected)))
+        self.assertEqual(self.ledger[2990:3010], expected[2990:3010])
+        self.assertEqual((self.ledger._base, len(self.ledger.amounts)), (3000, 200))
+
+class ConcurrentReaderTest(unittest.TestCase):
+    def test_reader_never_sees_a_partial_row(self):
+        ledger = Ledger(opening=0)
+        now = datetime.now()
+        done = threading.Event()
+        errors = []
+
+        def read():
+            while not done.is_set():
+                n = len(ledger)
+                if n:
+                    try:
+                        ledger.record(n - 1)
+                        ledger.columns(range(n - 1, max(n - 20, 0) - 1, -1))
+                    except IndexError as exc:
+                        errors.append(exc)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for i in range(100_000):
+                ledger.append('Deposit' if i % 2 else 'Withdrawal', 100, now)
+                if i % 1000 == 0:
+                    ledger.extend(['Deposit'] * 10, [5] * 10, now)
+        finally:
+            done.set()
+            reader.join()
+        self.assertEqual(errors, [])
+
+    def test_iterating_while_appending(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "i.journal")
+            account = BankAccount.create(path, "Iter", 0)
+            account.apply_batch([('deposit', 1)] * 5000)
+            account.close()
+            account = BankAccount.open(path)
+            ledger = account.transactions
+            done = threading.Event()
+            errors = []
+
+            def read():
+                while not done.is_set():
+                    try:
+                        rows = list(ledger)
+                        if len(rows) < 5000 or rows[0] != ledger.row(0):
+                            errors.append(len(rows))
+                    except (AttributeError, IndexError, ValueError) as exc:
+                        errors.append(exc)
+
+            reader = threading.Thread(target=read)
+            reader.start()
+            try:
+                for _ in range(3000):
+                    account.deposit(1)
+            finally:
+                done.set()
+                reader.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(len(ledger), 8000)
+            self.assertEqual(ledger.balance_after(7999), 8000)
+            account.close()
+
+if __name__ == "__main__":
+    unittest.main()
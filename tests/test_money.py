@@ -0,0 +1,79 @@
+# Integer-cent money: parsing, formatting and comparisons, and the property that an account's
+# balance always equals its opening balance plus the sum of its ledger after any mix of postings.
+import random
+import unittest
+from decimal import Decimal
+
+from banking import BankAccount, Money
+
+SIGNS = {'Deposit': 1, 'Withdrawal': -1, 'Transfer Sent': -1, 'Transfer Received': 1}
+
+def ledger_total(account):
+    return account.opening_balance + Money(sum(SIGNS[t[0]] * t[1].cents for t in account.transactions))
+
+class MoneyTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Money.parse("1,234.5").cents, 123450)
+        self.assertEqual(Money.parse("$12.34").cents, 1234)
+        self.assertEqual(Money.parse("-0.75").cents, -75)
+        for text in ("", "1.234", "abc", "1.2.3"):
+            with self.assertRaises(ValueError):
+                Money.parse(text)
+
+    def test_no_float_drift(self):
+        total = Money(0)
+        for _ in range(1000):
+            total += 0.1
+        self.assertEqual(total, Money.parse("100.00"))
+        self.assertEqual(f"{total:,.2f}", "100.00")
+
+    def test_equal_values_hash_alike(self):
+        for other in (1.5, Decimal("1.50"), 1.504, Decimal("1.504"), 1.1, 150, "1.50"):
+            if Money(150) == other and not isinstance(other, str):
+                self.assertEqual(hash(Money(150)), hash(other), other)
+        self.assertNotEqual(Money(150), 1.504)
+        self.assertNotIn(1.504, {Money(150)})
+        self.assertIn(1.5, {Money(150)})
+        self.assertNotEqual(Money(110), 1.1)
+        self.assertEqual(Money(110), Decimal("1.10"))
+        self.assertTrue(Money(150) <= 1.504 and Money(150) < 1.504 and Money(150) > 1.496)
+        self.assertFalse(Money(150) < float("nan") or Money(150) == float("nan"))
+
+    def test_booleans_are_not_amounts(self):
+        account = BankAccount("Bool", 10)
+        for post in (account.deposit, account.withdraw):
+            with self.assertRaises(TypeError):
+                post(True)
+        result = account.apply_batch([('deposit', True), ('deposit', 1)])
+        self.assertEqual(result.accepted, 1)
+        self.assertEqual(result.rejected, [(0, "Invalid amount True.")])
+        self.assertEqual(account.balance, 11)
+        self.assertNotEqual(Money(100), True)
+
+class BalanceMatchesLedgerTest(unittest.TestCase):
+    def test_random_postings(self):
+        rng = random.Random(7)
+        account = BankAccount("Check", Money.parse("100.10"))
+        other = BankAccount("Other", 0)
+        for i in range(5000):
+            amount = rng.choice([rng.random() * 500, f"{rng.randint(0, 500)}.{rng.randint(0, 99):02d}",
+                                 Decimal(rng.randint(1, 50_000)) / 100, rng.randint(1, 500)])
+            op = rng.randrange(4)
+            try:
+                if op == 0:
+                    account.deposit(amount)
+                elif op == 1:
+                    account.withdraw(amount)
+                elif op == 2:
+                    account.transfer(amount, other)
+                else:
+                    account.apply_batch([('deposit', amount), ('withdraw', amount), ('withdraw', amount)])
+            except ValueError:
+                pass
+            if i % 500 == 0:
+                self.assertEqual(account.balance, ledger_total(account), i)
+        self.assertEqual(account.balance, ledger_total(account))
+        self.assertEqual(other.balance, ledger_total(other))
+
+if __name__ == "__main__":
+    unittest.main()
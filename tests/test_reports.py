@@ -0,0 +1,66 @@
+# Bank-wide reports over a persistent bank: accounts not opened since a restart are read from
+# their journals, and overdraft attempts survive reopening. Ledgers caught mid-append are read
+# up to their published rows.
+import tempfile
+import unittest
+from datetime import date
+
+from banking import Bank, Money
+from reports import ReportEngine, _pack
+
+class PersistentReportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        bank = Bank(self.directory.name)
+        alice = bank.open_account("alice", 100)
+        bob = bank.open_account("bob", 50, 'Checking')
+        bank.open_account("carol", 10, 'Checking')
+        alice.deposit(25)
+        for amount in (80, 20):
+            with self.assertRaises(ValueError):
+                bob.withdraw(amount + 100)
+        bank.close()
+        self.today = date.today()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, report, alice):
+        self.assertEqual([(str(balance), holder) for balance, _, holder, _ in report.top_balances],
+                         [(str(alice), "alice"), ("50.00", "bob"), ("10.00", "carol")])
+        self.assertEqual(report.daily_net_flow['Savings'][self.today], Money(alice.cents - 10_000))
+        self.assertEqual(report.overdraft_attempts, {'Savings': 0, 'Checking': 2})
+
+    def test_report_after_restart_covers_every_journal(self):
+        bank = Bank(self.directory.name)
+        for processes in (1, 2):
+            report = ReportEngine(bank, processes=processes).report()
+            self.check(report, Money(12_500))
+        self.assertEqual(len(bank), 0)
+        bank.close()
+
+    def test_open_accounts_are_read_live(self):
+        bank = Bank(self.directory.name)
+        bank.find("alice").deposit(5)
+        self.assertEqual(bank.find("bob").overdraft_attempts, 2)
+        engine = ReportEngine(bank, processes=1)
+        self.check(engine.report(), bank.find("alice").balance)
+        bank.find("alice").deposit(1)
+        self.check(engine.report(), bank.find("alice").balance)
+        bank.close()
+
+class MidAppendTest(unittest.TestCase):
+    def test_unpublished_row_is_left_out(self):
+        bank = Bank()
+        account = bank.open_account("alice", 100)
+        account.deposit(5)
+        account.deposit(7)
+        # append() writes the timestamp before the balance and publishes the row last
+        account.transactions.timestamps.append(account.transactions.timestamps[-1])
+        micros, balances = _pack(account)[6:]
+        self.assertEqual((len(micros), len(balances)), (2, 2))
+        report = ReportEngine(bank, processes=1).report()
+        self.assertEqual(sum(report.daily_net_flow['Savings'].values()), Money(1200))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# Statement export and import: round trips in both formats, exports of journal-backed accounts
+# that leave the history in the journal, and imports that would go back in time or carry a type
+# or status the ledger does not know.
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from banking import TXN_STATUSES, TXN_TYPES, BankAccount
+
+START = datetime(2024, 3, 1)
+
+def fill(account, n, seed=12):
+    rng = random.Random(seed)
+    when = START
+    for i in range(n):
+        when += timedelta(minutes=rng.randint(0, 600))
+        kind = 'Withdrawal' if i % 3 == 0 else 'Deposit'
+        account._cents += 100 if kind == 'Deposit' else -100
+        account._record(kind, 100, when)
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "e.journal")
+        account = BankAccount.create(self.path, "Export", 10_000)
+        fill(account, 5000)
+        account.close()
+        self.expected = BankAccount("Export", 10_000)
+        fill(self.expected, 5000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.directory.name, name), "rb") as f:
+            return f.read()
+
+    def test_journal_backed_export_matches_and_stays_mapped(self):
+        account = BankAccount.open(self.path)
+        account.deposit(5)
+        self.expected.transactions.append('Deposit', 500, account.transactions.row(5000)[2])
+        end = START + timedelta(days=200)
+        for name, kwargs in (("all.bin", {}), ("all.csv", {}), ("w.bin", {"types": "Withdrawal"}),
+                             ("range.csv", {"start": START + timedelta(days=30), "end": end, "types": ["Deposit"]})):
+            self.assertEqual(account.export_statement(os.path.join(self.directory.name, name), **kwargs),
+                             self.expected.export_statement(os.path.join(self.directory.name, "x" + name), **kwargs))
+            self.assertEqual(self.read(name), self.read("x" + name))
+        self.assertEqual(account.transactions._base, 5000)
+        self.assertEqual(len(account.transactions.amounts), 1)
+        account.close()
+
+    def test_round_trip(self):
+        for name in ("s.bin", "s.csv.gz"):
+            path = os.path.join(self.directory.name, name)
+            self.expected.export_statement(path)
+            target = BankAccount("Import", 10_000)
+            self.assertEqual(target.import_statement(path), 5000)
+            self.assertEqual(list(target.transactions), list(self.expected.transactions))
+            self.assertEqual(target.balance, self.expected.balance)
+
+class ImportOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "march.csv")
+        source = BankAccount("Source", 0)
+        source._cents = 2500
+        source._record('Deposit', 2500, datetime(2024, 3, 1, 9, 30))
+        source.export_statement(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_import_keeps_dates(self):
+        target = BankAccount("Target", 0)
+        self.assertEqual(target.import_statement(self.path), 1)
+        self.assertEqual(target.transactions.row(0)[2], datetime(2024, 3, 1, 9, 30))
+        self.assertEqual(len(list(target.query(datetime(2024, 3, 1), datetime(2024, 4, 1)))), 1)
+
+    def test_import_older_than_latest_row_is_refused(self):
+        target = BankAccount("Target", 0)
+        target.deposit(10)
+        with self.assertRaisesRegex(ValueError, "row 1 .*2024-03-01.*0 rows were imported"):
+            target.import_statement(self.path)
+        self.assertEqual(len(target.transactions), 1)
+        self.assertEqual(target.balance, 10)
+
+    def test_rows_out_of_order_within_statement(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("2024-02-01 00:00:00,Deposit,1.00,26.00,Completed\n")
+        target = BankAccount("Target", 0)
+        with self.assertRaisesRegex(ValueError, "row 2 "):
+            target.import_statement(self.path)
+        self.assertEqual(len(target.transactions), 0)
+
+class UnknownNameTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.directory.name, "refund.csv")
+        self.journal = os.path.join(self.directory.name, "t.journal")
+        self.tables = list(TXN_TYPES), list(TXN_STATUSES)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, *rows):
+        with open(self.csv, "w", encoding="utf-8") as f:
+            f.write("date,type,amount,balance,status\n")
+            f.writelines(row + "\n" for row in rows)
+
+    def test_unknown_type_or_status_is_refused(self):
+        for row, message in (("2024-03-02 00:00:00,Refund,1.00,1.00,Completed", "row 2 .*type 'Refund'"),
+                             ("2024-03-02 00:00:00,Deposit,1.00,1.00,Pending", "row 2 .*status 'Pending'")):
+            self.write("2024-03-01 00:00:00,Deposit,1.00,1.00,Completed", row)
+            target = BankAccount.create(self.journal, "Target", 0)
+            with self.assertRaisesRegex(ValueError, message):
+                target.import_statement(self.csv)
+            target.close()
+            self.assertEqual((list(TXN_TYPES), list(TXN_STATUSES)), self.tables)
+            reopened = BankAccount.open(self.journal)
+            self.assertEqual(list(reopened.transactions), [])
+            reopened.close()
+            os.remove(self.journal)
+            os.remove(self.journal + ".snap")
+
+    def test_ledger_refuses_new_names(self):
+        account = BankAccount("Target", 0)
+        with self.assertRaisesRegex(ValueError, "Refund"):
+            account.transactions.append('Refund', 100, START)
+        with self.assertRaisesRegex(ValueError, "Pending"):
+            account.transactions.extend(['Deposit'], [100], START, 'Pending')
+        self.assertEqual(len(account.transactions), 0)
+        self.assertEqual((list(TXN_TYPES), list(TXN_STATUSES)), self.tables)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+# Unit conversions shared by the account model, statements, reports and formatting: times are
+# integer microseconds since 1970-01-01, money is integer cents. Standard library only, so any
+# module can import it without pulling in banking.
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICRO = timedelta(microseconds=1)
+DAY_MICROS = 86_400_000_000
+
+_EXACT_FLOAT_CENTS = 2 ** 50  # below this, cents / 100 formats back to the exact two-decimal value
+
+def to_micros(dt):
+    # Naive wall-clock datetime -> integer microseconds since 1970-01-01 (exact round trip)
+    return (dt - EPOCH) // ONE_MICRO
+
+def from_micros(us):
+    return EPOCH + timedelta(microseconds=us)
+
+def format_cents(cents, spec='.2f'):
+    if -_EXACT_FLOAT_CENTS < cents < _EXACT_FLOAT_CENTS:
+        return format(cents / 100, spec or '.2f')
+    return format(Decimal(cents).scaleb(-2), spec or '.2f')